@@ -1,10 +1,9 @@
 from logging.config import fileConfig
-from sqlalchemy import create_engine, pool
+from sqlalchemy import create_engine
 from alembic import context
 import os
 from dotenv import load_dotenv
-from app.utils.db import Base  # <-- import your Base
-from app.models import models  # <-- import all models so Alembic sees them  # noqa: F401
+from app.models.models import Base  # <-- importing Base from models registers every table
 
 # Load env variables
 load_dotenv()
@@ -31,6 +30,8 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
+        compare_type=True,
     )
 
     with context.begin_transaction():
@@ -39,20 +40,27 @@ def run_migrations_offline():
 
 def run_migrations_online():
     """Run migrations in 'online' mode."""
+    # Alembic uses a single connection: keep it pooled for the whole run.
     connectable = create_engine(
         config.get_main_option("sqlalchemy.url"),
-        poolclass=pool.NullPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_pre_ping=True,
     )
 
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+            compare_type=True,
         )
 
         with context.begin_transaction():
             context.run_migrations()
 
+    connectable.dispose()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
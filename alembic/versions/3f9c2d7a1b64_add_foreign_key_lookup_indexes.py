@@ -0,0 +1,63 @@
+"""add foreign key lookup indexes
+
+Revision ID: 3f9c2d7a1b64
+Revises: 8b2a5a8e46b5
+Create Date: 2026-10-15 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2d7a1b64'
+down_revision: Union[str, Sequence[str], None] = '8b2a5a8e46b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction and does not
+    # block writes on the (possibly large) tables while it builds.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_sessions_user', 'sessions', ['user_id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_threads_session_created', 'threads', ['session_id', 'created_at'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_messages_thread_created', 'messages', ['thread_id', 'created_at'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_evt_active', 'email_verification_tokens', ['user_id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+            postgresql_where=sa.text('used_at IS NULL')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_evt_active', table_name='email_verification_tokens',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'ix_messages_thread_created', table_name='messages',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'ix_threads_session_created', table_name='threads',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'ix_sessions_user', table_name='sessions',
+            postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,68 @@
+"""size user columns and message role enum
+
+Revision ID: a7e41c9d0f25
+Revises: 3f9c2d7a1b64
+Create Date: 2026-10-15 11:03:18.550127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e41c9d0f25'
+down_revision: Union[str, Sequence[str], None] = '3f9c2d7a1b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+message_role = postgresql.ENUM('user', 'assistant', 'system', name='message_role')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column(
+            'username', type_=sa.String(length=64), existing_type=sa.String(), existing_nullable=False
+        )
+        batch_op.alter_column(
+            'email', type_=sa.String(length=254), existing_type=sa.String(), existing_nullable=False
+        )
+
+    message_role.create(op.get_bind(), checkfirst=True)
+
+    with op.batch_alter_table('messages') as batch_op:
+        batch_op.alter_column(
+            'id', type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=False
+        )
+        batch_op.alter_column(
+            'role', type_=message_role, existing_type=sa.String(), existing_nullable=False,
+            postgresql_using='role::message_role'
+        )
+    # SERIAL sequences are created AS integer; widen it along with the column
+    op.execute('ALTER SEQUENCE messages_id_seq AS BIGINT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER SEQUENCE messages_id_seq AS INTEGER')
+    with op.batch_alter_table('messages') as batch_op:
+        batch_op.alter_column(
+            'role', type_=sa.String(), existing_type=message_role, existing_nullable=False,
+            postgresql_using='role::text'
+        )
+        batch_op.alter_column(
+            'id', type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=False
+        )
+
+    message_role.drop(op.get_bind(), checkfirst=True)
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column(
+            'email', type_=sa.String(), existing_type=sa.String(length=254), existing_nullable=False
+        )
+        batch_op.alter_column(
+            'username', type_=sa.String(), existing_type=sa.String(length=64), existing_nullable=False
+        )
@@ -0,0 +1,40 @@
+"""server side token timestamps
+
+Revision ID: d2b8e5f17c03
+Revises: a7e41c9d0f25
+Create Date: 2026-10-15 11:02:37.518209
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b8e5f17c03'
+down_revision: Union[str, Sequence[str], None] = 'a7e41c9d0f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('email_verification_tokens', 'password_reset_tokens'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                'created_at',
+                existing_type=sa.DateTime(timezone=True),
+                server_default=sa.text('now()')
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('password_reset_tokens', 'email_verification_tokens'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                'created_at',
+                existing_type=sa.DateTime(timezone=True),
+                server_default=None
+            )
@@ -0,0 +1,52 @@
+"""token and message order indexes
+
+Revision ID: e6a1f3c84b92
+Revises: d2b8e5f17c03
+Create Date: 2026-10-15 14:37:09.816342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a1f3c84b92'
+down_revision: Union[str, Sequence[str], None] = 'd2b8e5f17c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        # Declared on the model but never created by a migration; a no-op on
+        # databases that got it from create_all
+        op.create_index(
+            'ix_email_verification_tokens_token', 'email_verification_tokens', ['token'],
+            unique=True, postgresql_concurrently=True, if_not_exists=True
+        )
+        # Messages are always read ordered by (created_at, id); with id in the
+        # index both the oldest-first and newest-first LIMIT reads skip the sort
+        op.create_index(
+            'ix_messages_thread_created_id', 'messages', ['thread_id', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index(
+            'ix_messages_thread_created', table_name='messages',
+            postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The token index is kept: it may predate this revision
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_thread_created', 'messages', ['thread_id', 'created_at'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index(
+            'ix_messages_thread_created_id', table_name='messages',
+            postgresql_concurrently=True, if_exists=True
+        )
@@ -1,33 +1,60 @@
+from functools import lru_cache
+
 from agents import AsyncOpenAI, OpenAIChatCompletionsModel
 from agents.run import RunConfig
-from dotenv import load_dotenv
-import os
+from fastapi import Depends, Request
+
+from app.config import settings
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+GEMINI_MODEL = "gemini-2.5-flash"
+
 
-load_dotenv()
+def create_openai_client() -> AsyncOpenAI:
+    """Create the OpenAI-compatible client used to reach Gemini"""
+    if not settings.GEMINI_API_KEY:
+        raise Exception("API key not set")
 
-gemini_api_key = os.getenv("GEMINI_API_KEY")
+    return AsyncOpenAI(
+        api_key=settings.GEMINI_API_KEY,
+        base_url=GEMINI_BASE_URL
+    )
 
-if not gemini_api_key:
-    raise Exception("API key not set")
 
-external_client = AsyncOpenAI(
-    api_key = gemini_api_key,
-    base_url = "https://generativelanguage.googleapis.com/v1beta/openai/"
-)
+@lru_cache(maxsize=4)
+def _model_for(client: AsyncOpenAI, name: str) -> OpenAIChatCompletionsModel:
+    """Chat completions model for (client, model name), built once per pair"""
+    return OpenAIChatCompletionsModel(
+        model=name,
+        openai_client=client
+    )
 
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash",
-    openai_client = external_client
-)
 
-run_config = RunConfig(
-    model=model,
-    model_provider= external_client,
-    tracing_disabled=True
-)
+def get_model(client: AsyncOpenAI, name: str = GEMINI_MODEL) -> OpenAIChatCompletionsModel:
+    """Chat completions model bound to the given client"""
+    return _model_for(client, name)
 
 
+@lru_cache(maxsize=4)
+def get_run_config(client: AsyncOpenAI, model_name: str = GEMINI_MODEL) -> RunConfig:
+    """Runner configuration bound to the given client, reused across calls"""
+    return RunConfig(
+        model=get_model(client, model_name),
+        model_provider=client,
+        tracing_disabled=True
+    )
 
 
+def get_openai_client(request: Request) -> AsyncOpenAI:
+    """Dependency returning the process-wide client created in the app lifespan"""
+    client = getattr(request.app.state, "openai_client", None)
+    if client is None:
+        # Lifespan did not run (e.g. ASGI test transport), create it lazily once
+        client = create_openai_client()
+        request.app.state.openai_client = client
+    return client
 
 
+def get_agent_run_config(client: AsyncOpenAI = Depends(get_openai_client)) -> RunConfig:
+    """Dependency returning the run config for the shared client"""
+    return get_run_config(client)
@@ -1,19 +1,35 @@
+from functools import lru_cache
+from typing import Final
+
 from agents import Agent
 
-triage_agent = Agent(name="Assistant", instructions="You are a helpful assistant")
+_TRIAGE_PROMPT: Final[str] = "You are a helpful assistant"
+
+_TITLE_PROMPT: Final[str] = """You are a helpful assistant that generates short, descriptive titles for conversation threads.
+Generate a title that is 3-6 words maximum, capturing the main topic or intent of the message.
+Don't give the title as a question, summarize instead.
+Respond with ONLY the title, nothing else.
+
+Examples:
+User: "What’s the difference between list and tuple in Python?"
+Title: "List vs Tuple in Python"
+
+User: "Explain how to use Alembic in FastAPI"
+Title: "Using Alembic with FastAPI"
+"""
+
+
+@lru_cache(maxsize=1)
+def get_triage_agent() -> Agent:
+    """Build the main assistant agent once"""
+    return Agent(name="Assistant", instructions=_TRIAGE_PROMPT)
+
 
+@lru_cache(maxsize=1)
+def get_thread_title_agent() -> Agent:
+    """Build the thread title generator agent once"""
+    return Agent(name="Generate Thread Title", instructions=_TITLE_PROMPT)
 
-thread_title_generator_Agent = Agent(
-                    name="Generate Thread Title",
-                    instructions="""You are a helpful assistant that generates short, descriptive titles "
-                    "for conversation threads. Generate a title that is 3-6 words maximum, "
-                    "capturing the main topic or intent of the message. don't give title name as question instead summarize"
-                    "Respond with ONLY the title, nothing else.
-                    Examples:
-                    User: "What’s the difference between list and tuple in Python?"
-                    Title: "List vs Tuple in Python"
 
-                    User: "Explain how to use Alembic in FastAPI"
-                    Title: "Using Alembic with FastAPI"
-                    """
-                )
\ No newline at end of file
+triage_agent = get_triage_agent()
+thread_title_generator_Agent = get_thread_title_agent()
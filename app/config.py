@@ -1,66 +1,121 @@
 import os
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
-# Determine which environment to load
-env = os.getenv("ENV", "development")
+# .env file for each environment (anything else falls back to ".env")
+ENV_FILES = {
+    "test": ".env.test",
+    "production": ".env.production",
+}
 
-# Load appropriate .env file
-if env == "test":
-    load_dotenv(dotenv_path=".env.test", override=True)
-elif env == "production":
-    load_dotenv(dotenv_path=".env.production", override=True)
-else:
-    load_dotenv(dotenv_path=".env", override=True)
+
+@lru_cache(maxsize=1)
+def _load_env() -> str:
+    """Load the .env file for the current environment once and return its path"""
+    env_file = ENV_FILES.get(os.getenv("ENV", "development"), ".env")
+    load_dotenv(dotenv_path=env_file, override=True)
+    return env_file
+
+
+# Determine and load the appropriate .env file
+ENV_FILE = _load_env()
 
 
 class Settings(BaseSettings):
     """Application settings"""
-    
+
+    model_config = SettingsConfigDict(
+        env_file=ENV_FILE,
+        case_sensitive=True,
+        extra="ignore",
+        frozen=True,
+    )
+
     # Environment
-    ENV: str = os.getenv("ENV", "development")
-    
+    ENV: str = "development"
+
     # Database
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
-    
+    DATABASE_URL: str = ""
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800  # seconds; recycle before NAT/idle timeouts drop the socket
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection before erroring
+    # Open a fresh connection per checkout; use behind PgBouncer, which does the pooling
+    DB_USE_NULL_POOL: bool = False
+    # asyncpg prepared statement cache per connection; set 0 behind PgBouncer transaction pooling
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Redis (optional; caching is disabled when REDIS_URL is empty)
+    REDIS_URL: str = ""
+    USER_CACHE_TTL_SECONDS: int = 300
+    # Reuse LLM replies for identical conversations (off by default: replies are not deterministic)
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_TTL_SECONDS: int = 3600
+
     # JWT
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
-    ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    SECRET_KEY: str = "your-secret-key-change-in-production"
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Password hashing (argon2 time cost; lower it in development for faster logins)
+    PASSWORD_HASH_ROUNDS: int = 3
+
+    # LLM
+    GEMINI_API_KEY: str = ""
 
     # Email Verification
-    EMAIL_VERIFICATION_TOKEN_EXPIRE_HOURS: int = int(os.getenv("EMAIL_VERIFICATION_TOKEN_EXPIRE_HOURS", "24"))
-    EMAIL_VERIFICATION_REQUIRED: bool = os.getenv("EMAIL_VERIFICATION_REQUIRED", "True").lower() == "true"
-    
+    EMAIL_VERIFICATION_TOKEN_EXPIRE_HOURS: int = 24
+    EMAIL_VERIFICATION_REQUIRED: bool = True
+
     # Password Reset
-    PASSWORD_RESET_TOKEN_EXPIRE_HOURS: int = int(os.getenv("PASSWORD_RESET_TOKEN_EXPIRE_HOURS", "1"))
+    PASSWORD_RESET_TOKEN_EXPIRE_HOURS: int = 1
 
 
     # SMTP Settings
-    SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
-    SMTP_PORT: int = os.getenv("SMTP_PORT", "587")
-    SMTP_USER: str = os.getenv("SMTP_USER", "")
-    SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
-    SMTP_FROM_EMAIL: str = os.getenv("SMTP_FROM_EMAIL", "noreply@example.com")
-    SMTP_TLS: bool = os.getenv("SMTP_TLS", "True").lower() == "true"
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 587
+    SMTP_USER: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_FROM_EMAIL: str = "noreply@example.com"
+    SMTP_TLS: bool = True
+    # Pooled SMTP connections; each is rotated after this many messages or seconds,
+    # which keeps rate-limited providers from dropping long-lived sessions
+    SMTP_POOL_SIZE: int = 4
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_MAX_CONNECTION_AGE_SECONDS: int = 300
+    # Background email delivery retries (exponential backoff between attempts,
+    # capped so a failing send holds its threadpool worker only briefly)
+    EMAIL_SEND_MAX_ATTEMPTS: int = 3
+    EMAIL_SEND_BACKOFF_SECONDS: float = 0.5
+    EMAIL_SEND_MAX_BACKOFF_SECONDS: float = 2.0
 
 
     # Frontend URL (for email verification links)
-    FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:8000/auth")
-    
+    FRONTEND_URL: str = "http://localhost:8000/auth"
+
     # Application
-    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
-    TESTING: bool = os.getenv("TESTING", "False").lower() == "true"
-    
-    class Config:
-        case_sensitive = True
+    DEBUG: bool = False
+    LOG_LEVEL: str = "INFO"
+    TESTING: bool = False
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Build and validate the settings once per process.
+
+    Also usable as a FastAPI dependency (``Depends(get_settings)``) so
+    tests can swap it via ``app.dependency_overrides``.
+    """
+    return Settings()
 
 
 # Create settings instance
-settings = Settings()
+settings = get_settings()
 
 # Validate DATABASE_URL exists
 if not settings.DATABASE_URL:
     raise ValueError(
         "DATABASE_URL is not set. Please check your .env file or environment variables."
-    )
\ No newline at end of file
+    )
@@ -1,32 +1,89 @@
 # app/main.py
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 # from app.utils.db import engine, Base
 from app.routers import auth, sessions, threads, messages
-from app.utils.db import init_db, close_db
+from app.utils.db import init_db, close_db, AsyncSessionLocal
+from app.utils.cache import close_redis
+from app.utils.email_filter import init_email_filter
+from app.utils.smtp import close_smtp_pool
+from app.utils.log_config import setup_logging, shutdown_logging
+from app.utils.exception_handlers import register_exception_handlers
+from app.agent_services.agent_config import create_openai_client
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Lifespan context manager for startup and shutdown events"""
-    # Startup
-    print("🚀 Starting up...")
+async def logging_lifespan(app: FastAPI):
+    """Write application logs from a background thread for the app's lifetime"""
+    setup_logging()
+    yield
+    shutdown_logging()
+
+
+@asynccontextmanager
+async def db_lifespan(app: FastAPI):
+    """Create tables (development only) on startup and close database connections on shutdown"""
     await init_db()
     print("✅ Database initialized")
     yield
-    # Shutdown
-    print("🛑 Shutting down...")
     await close_db()
     print("✅ Database connections closed")
 
 
+@asynccontextmanager
+async def llm_client_lifespan(app: FastAPI):
+    """Share one LLM client (and its HTTP connection pool) across requests"""
+    app.state.openai_client = create_openai_client()
+    print("✅ LLM client created")
+    yield
+    await app.state.openai_client.close()
+    print("✅ LLM client closed")
+
+
+@asynccontextmanager
+async def cache_lifespan(app: FastAPI):
+    """Prepare the known-email filter on startup and close the shared Redis client on shutdown"""
+    async with AsyncSessionLocal() as db:
+        await init_email_filter(db)
+    yield
+    await close_redis()
+
+
+@asynccontextmanager
+async def smtp_lifespan(app: FastAPI):
+    """Close pooled SMTP connections on shutdown"""
+    yield
+    close_smtp_pool()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifespan context manager for startup and shutdown events"""
+    # Startup
+    print("🚀 Starting up...")
+    async with (
+        logging_lifespan(app),
+        db_lifespan(app),
+        llm_client_lifespan(app),
+        cache_lifespan(app),
+        smtp_lifespan(app),
+    ):
+        yield
+        # Shutdown
+        print("🛑 Shutting down...")
+
+
 app = FastAPI(
     title="Learning Mode Agent API",
     description="API for Learning Mode Agent",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+register_exception_handlers(app)
+
 # include routers
 app.include_router(auth.router)
 app.include_router(sessions.router)
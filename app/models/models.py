@@ -1,78 +1,145 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, func, Boolean
+from sqlalchemy import (
+    Integer, BigInteger, String, ForeignKey, Text, DateTime, func, Boolean, Index, Enum, text
+)
 from datetime import datetime, timezone
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.utils.db import Base
 
+__all__ = [
+    "Base",
+    "User",
+    "UserSession",
+    "Thread",
+    "Message",
+    "EmailVerificationToken",
+    "PasswordResetToken",
+]
+
+
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String, unique=True, nullable=False, index=True)
-    email = Column(String, unique=True, nullable=False, index=True)
-    password = Column(String, nullable=False)  # hashed
-    is_verified = Column(Boolean, default=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, init=False)
+    username: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
+    email: Mapped[str] = mapped_column(String(254), unique=True, nullable=False, index=True)
+    password: Mapped[str] = mapped_column(String, nullable=False, repr=False)  # hashed
+    is_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=lambda: datetime.now(timezone.utc), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=True, init=False
+    )
+    # Rendered as now() inside the UPDATE statement instead of a Python-side bind value
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), onupdate=func.now(), nullable=True, init=False
+    )
 
     # Relationships
-    sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan")
-    verification_tokens = relationship("EmailVerificationToken", back_populates="user", cascade="all, delete-orphan")
-    reset_tokens = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan")
+    # Relationships never load implicitly; eager-load them with selectinload()/joinedload()
+    # where needed. passive_deletes lets the ON DELETE CASCADE foreign keys remove children.
+    sessions: Mapped[list["UserSession"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan",
+        passive_deletes=True, lazy="raise_on_sql", init=False, repr=False
+    )
+    verification_tokens: Mapped[list["EmailVerificationToken"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan",
+        passive_deletes=True, lazy="raise_on_sql", init=False, repr=False
+    )
+    reset_tokens: Mapped[list["PasswordResetToken"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan",
+        passive_deletes=True, lazy="raise_on_sql", init=False, repr=False
+    )
     
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', verified={self.is_verified})>"
 
 class UserSession(Base):
     __tablename__ = "sessions"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    agent_type = Column(String, nullable=True)  # optional
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-
-    user = relationship("User", back_populates="sessions")
-    threads = relationship("Thread", back_populates="session", cascade="all, delete-orphan")
+    __table_args__ = (
+        Index("ix_sessions_user", "user_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, init=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    agent_type: Mapped[str | None] = mapped_column(String, nullable=True, default=None)  # optional
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=True, init=False
+    )
+
+    user: Mapped["User"] = relationship(
+        back_populates="sessions", lazy="raise_on_sql", init=False, repr=False
+    )
+    threads: Mapped[list["Thread"]] = relationship(
+        back_populates="session", cascade="all, delete-orphan",
+        passive_deletes=True, lazy="raise_on_sql", init=False, repr=False
+    )
 
 
 class Thread(Base):
     __tablename__ = "threads"
-
-    id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
-    title = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-
-    session = relationship("UserSession", back_populates="threads")
-    messages = relationship("Message", back_populates="thread", cascade="all, delete-orphan")
+    __table_args__ = (
+        Index("ix_threads_session_created", "session_id", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, init=False)
+    session_id: Mapped[int] = mapped_column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
+    title: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=True, init=False
+    )
+
+    session: Mapped["UserSession"] = relationship(
+        back_populates="threads", lazy="raise_on_sql", init=False, repr=False
+    )
+    messages: Mapped[list["Message"]] = relationship(
+        back_populates="thread", cascade="all, delete-orphan",
+        passive_deletes=True, lazy="raise_on_sql",
+        order_by="[Message.created_at, Message.id]", init=False, repr=False
+    )
 
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_thread_created_id", "thread_id", "created_at", "id"),
+    )
+    # Fetch server-generated created_at with RETURNING on INSERT, no refresh needed
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(Integer, primary_key=True, index=True)
-    thread_id = Column(Integer, ForeignKey("threads.id", ondelete="CASCADE"), nullable=False)
-    role = Column(String, nullable=False)   # "user" | "assistant" | "system"
-    content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True, init=False)
+    thread_id: Mapped[int] = mapped_column(Integer, ForeignKey("threads.id", ondelete="CASCADE"), nullable=False)
+    role: Mapped[str] = mapped_column(Enum("user", "assistant", "system", name="message_role"), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False, repr=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=True, init=False
+    )
 
-    thread = relationship("Thread", back_populates="messages")
+    thread: Mapped["Thread"] = relationship(
+        back_populates="messages", lazy="raise_on_sql", init=False, repr=False
+    )
 
 
 class EmailVerificationToken(Base):
     """Model for email verification tokens"""
     
     __tablename__ = "email_verification_tokens"
+    __table_args__ = (
+        # Lookup of a user's still-unused tokens
+        Index("ix_evt_active", "user_id", postgresql_where=text("used_at IS NULL")),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token = Column(String(255), unique=True, nullable=False, index=True)
-    expires_at = Column(DateTime(timezone=True), nullable=False)
-    used_at = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, init=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True, repr=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=True, init=False
+    )
     
     # Relationship
-    user = relationship("User", back_populates="verification_tokens")
+    user: Mapped["User"] = relationship(
+        back_populates="verification_tokens", lazy="raise_on_sql", init=False, repr=False
+    )
     
     def __repr__(self):
         return f"<EmailVerificationToken(id={self.id}, user_id={self.user_id}, used={self.used_at is not None})>"
@@ -93,15 +160,19 @@ class PasswordResetToken(Base):
     
     __tablename__ = "password_reset_tokens"
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token = Column(String(255), unique=True, nullable=False, index=True)
-    expires_at = Column(DateTime(timezone=True), nullable=False)
-    used_at = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, init=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True, repr=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=True, init=False
+    )
     
     # Relationship
-    user = relationship("User", back_populates="reset_tokens")
+    user: Mapped["User"] = relationship(
+        back_populates="reset_tokens", lazy="raise_on_sql", init=False, repr=False
+    )
     
     def __repr__(self):
         return f"<PasswordResetToken(id={self.id}, user_id={self.user_id}, used={self.used_at is not None})>"
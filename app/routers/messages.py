@@ -1,61 +1,203 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Path
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+import asyncio
 import logging
 
-from app.schemas.schemas import MessageCreate, MessageOut, ChatResponse
+from app.schemas.schemas import MessageCreate, MessageOut, ChatResponse, ChatStreamChunk
 from app.utils.db import get_db_session
 from app.routers.auth import get_current_user
-from app.services.thread_service import ThreadService, ThreadNotFoundError
+from app.services.thread_service import ThreadService, ThreadNotFoundError, ThreadAccessDeniedError
 from app.services.message_service import MessageService
-from app.models.models import User
+from app.models.models import User, Thread, Message
 
 from agents import Runner
+from agents.run import RunConfig
+from openai.types.responses import ResponseTextDeltaEvent
 from app.agent_services.main_agent import triage_agent, thread_title_generator_Agent
-from app.agent_services.agent_config import run_config
+from app.agent_services.agent_config import get_agent_run_config, GEMINI_MODEL
+from app.utils.llm_cache import cache_key, get_cached_reply, cache_reply
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/messages", tags=["Messages"])
 
+# Built once; validates a whole list of ORM messages in one call
+_MSG_LIST_ADAPTER = TypeAdapter(list[MessageOut])
+
+
+def _sse(chunk: ChatStreamChunk) -> str:
+    """Format a stream chunk as a server-sent event"""
+    return f"data: {chunk.model_dump_json()}\n\n"
+
+
+# First messages with at most this many words are used as the title as-is
+_SHORT_TITLE_WORDS = 8
+
+# Translation table that strips quotes from generated titles
+_TITLE_QUOTES = str.maketrans("", "", "\"'")
+
+
+def _title_from_words(words: list[str]) -> str:
+    """Join words into a thread title of at most 50 characters"""
+    title = " ".join(words)
+    if len(title) > 50:
+        title = title[:47] + "..."
+    return title or "New Conversation"
+
 
 # Add this function in app/routers/messages.py after imports
 
-async def generate_thread_name(first_message: str) -> str:
+async def generate_thread_name(first_message: str, run_config: RunConfig) -> str:
     """
-    Generate a short thread name based on the first message using LLM.
+    Generate a short thread name based on the first message.
+    
+    Messages of up to _SHORT_TITLE_WORDS words are used directly; longer
+    ones are summarized by the title agent.
     
     Args:
         first_message: The first user message in the thread
+        run_config: Runner configuration for the shared LLM client
         
     Returns:
         A short, descriptive thread name (max 50 characters)
     """
+    # Short messages already read like a title, skip the LLM call
+    words = first_message.split()
+    if len(words) <= _SHORT_TITLE_WORDS:
+        return _title_from_words(words)
+    
     try:
         # Create a simple prompt for name generation
         name_prompt = f"Generate a short title for this conversation:\n\n{first_message}"
         
         result = await Runner.run(thread_title_generator_Agent, name_prompt, run_config=run_config)
-        thread_name = str(result.final_output).strip()
-        
-        # Clean up the name
-        thread_name = thread_name.replace('"', '').replace("'", '')
-        
-        # Limit to 50 characters
+        # Drop quotes in one pass, then limit to 50 characters
+        thread_name = str(result.final_output).translate(_TITLE_QUOTES).strip()
         if len(thread_name) > 50:
-            thread_name = thread_name[:30] + "..."
+            thread_name = thread_name[:47] + "..."
         
-        logger.info(f"Generated thread name: '{thread_name}'")
+        logger.info("Generated thread name: '%s'", thread_name)
         return thread_name
         
     except Exception as e:
-        logger.error(f"Error generating thread name: {str(e)}", exc_info=True)
+        logger.error("Error generating thread name: %s", e, exc_info=True)
         # Fallback to a default name based on first few words
-        words = first_message.split()[:5]
-        fallback_name = " ".join(words)
-        if len(fallback_name) > 50:
-            fallback_name = fallback_name[:47] + "..."
-        return fallback_name or "New Conversation"
+        return _title_from_words(words[:5])
+
+
+async def _prepare_conversation(
+    thread_id: int,
+    content: str,
+    thread_svc: ThreadService,
+    msg_svc: MessageService,
+    current_user: User,
+    run_config: RunConfig,
+    load_history: bool = True
+) -> tuple[Thread, list[Message] | None, list[dict], asyncio.Task | None]:
+    """
+    Load an owned thread and build the LLM input for a new user message.
+    
+    For the first message of an untitled thread, also starts generating a
+    thread name in the background.
+    
+    Args:
+        thread_id: ID of the thread
+        content: New user message content
+        thread_svc: Thread service bound to the request session
+        msg_svc: Message service bound to the request session
+        current_user: Authenticated user
+        run_config: Runner configuration for the shared LLM client
+        load_history: Load the history as Message objects (for the response);
+            when False only role/content rows are fetched and history is None
+        
+    Returns:
+        The thread, the stored history, the LLM input and the thread
+        naming task (None when no name is needed)
+        
+    Raises:
+        HTTPException: 404/403 for a missing or foreign thread, 500 on DB errors
+    """
+    # 1. Verify thread exists
+    try:
+        thread = await thread_svc.get_thread_by_id(thread_id, load_session=True)
+    except ThreadNotFoundError:
+        logger.warning("Thread %s not found", thread_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thread not found"
+        )
+    except Exception as e:
+        logger.error("Error retrieving thread %s: %s", thread_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while retrieving the thread"
+        )
+    
+    # 2. Verify ownership
+    if thread.session.user_id != current_user.id:
+        logger.warning(
+            "User %s attempted to access thread %s owned by user %s",
+            current_user.id, thread_id, thread.session.user_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to post to this thread"
+        )
+
+    # 3. Fetch conversation history and append the new user message
+    try:
+        if load_history:
+            history = await msg_svc.get_messages_for_thread(thread.id)
+            messages_for_llm = [
+                {"role": m.role, "content": m.content} 
+                for m in history
+            ]
+        else:
+            history = None
+            messages_for_llm = await msg_svc.get_role_content_for_llm(thread.id)
+        is_first_message = len(messages_for_llm) == 0
+        messages_for_llm.append({"role": "user", "content": content})
+        logger.info(
+            "Sending %s messages to LLM for thread %s", len(messages_for_llm), thread_id
+        )
+    except Exception as e:
+        logger.error("Error fetching message history: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve message history"
+        )
+
+    
+    # 3.5. Start naming the thread if this is the first message; the title
+    # LLM call runs alongside the main one and is saved after it
+    title_task = None
+    if is_first_message and not thread.title:
+        logger.info("Generating thread name for thread %s", thread_id)
+        title_task = asyncio.create_task(generate_thread_name(content, run_config))
+
+    return thread, history, messages_for_llm, title_task
+
+
+async def _save_thread_title(
+    thread_svc: ThreadService,
+    thread_id: int,
+    title_task: asyncio.Task
+) -> None:
+    """
+    Wait for a background thread name and store it.
+    
+    Runs after the main LLM call so the session is never used concurrently.
+    Naming failures are logged and never fail the message.
+    """
+    try:
+        thread_name = await title_task
+        await thread_svc.update_thread_title(thread_id, thread_name)
+        logger.info("Thread %s named: '%s'", thread_id, thread_name)
+    except Exception as e:
+        logger.warning("Failed to generate thread name for thread %s: %s", thread_id, e)
 
 
 @router.post(
@@ -75,17 +217,17 @@ async def send_message(
     thread_id: int = Path(..., description="ID of the thread"),
     payload: MessageCreate = ...,
     db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    run_config: RunConfig = Depends(get_agent_run_config)
 ):
     """
     Send a message to a thread and get AI response.
     
     **Flow:**
     1. Validates thread exists and belongs to user
-    2. Saves user message to database
-    3. Sends conversation history to AI
-    4. Saves AI response to database
-    5. Returns AI response with full conversation history
+    2. Sends conversation history plus the new message to AI
+    3. Saves the user message and AI response to database in one INSERT
+    4. Returns AI response with full conversation history
     
     **Parameters:**
     - **thread_id**: ID of the thread
@@ -103,137 +245,75 @@ async def send_message(
     ```
     """
     thread_svc = ThreadService(db)
-    
-    # 1. Verify thread exists
-    try:
-        thread = await thread_svc.get_thread_by_id(thread_id, load_session=True)
-    except ThreadNotFoundError:
-        logger.warning(f"Thread {thread_id} not found")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Thread not found"
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving thread {thread_id}: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An error occurred while retrieving the thread"
-        )
-    
-    # 2. Verify ownership
-    if thread.session.user_id != current_user.id:
-        logger.warning(
-            f"User {current_user.id} attempted to access thread {thread_id} "
-            f"owned by user {thread.session.user_id}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not allowed to post to this thread"
-        )
-
     msg_svc = MessageService(db)
-    
-    # 3. Save user message
-    try:
-        logger.info(
-            f"Saving user message to thread {thread_id}: '{payload.content[:50]}...'"
-        )
-        user_msg = await msg_svc.add_message(  # noqa: F841
-            thread_id=thread.id,
-            role="user",
-            content=payload.content
-        )
-    except Exception as e:
-        logger.error(f"Error saving user message: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to save message"
-        )
-
-    # 4. Fetch conversation history
-    try:
-        history = await msg_svc.get_messages_for_thread(thread.id)
-        messages_for_llm = [
-            {"role": m.role, "content": m.content} 
-            for m in history
-        ]
-        logger.info(
-            f"Sending {len(messages_for_llm)} messages to LLM for thread {thread_id}"
-        )
-    except Exception as e:
-        logger.error(f"Error fetching message history: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve message history"
-        )
+    thread, history, messages_for_llm, title_task = await _prepare_conversation(
+        thread_id, payload.content, thread_svc, msg_svc, current_user, run_config
+    )
 
-    
-    # 4.5. Generate thread name if this is the first message
-    is_first_message = len(history) == 1
-    if is_first_message and not thread.title:
+    # 4. Run LLM, unless an identical conversation already has a cached reply
+    llm_key = cache_key(GEMINI_MODEL, messages_for_llm)
+    assistant_reply = await get_cached_reply(llm_key)
+    if assistant_reply is not None:
+        logger.info("Using cached LLM reply for thread %s", thread_id)
+    else:
         try:
-            logger.info(f"Generating thread name for thread {thread_id}") 
-            thread_name = await generate_thread_name(payload.content)
-            # Update thread title
-            thread_svc = ThreadService(db)
-            await thread_svc.update_thread_title(thread_id, thread_name)
-            logger.info(f"Thread {thread_id} named: '{thread_name}'")
+            logger.info("Running LLM for thread %s", thread_id)
+            result = await Runner.run(
+                triage_agent, 
+                messages_for_llm, 
+                run_config=run_config
+            )
+            assistant_reply = str(result.final_output)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "LLM response received for thread %s: '%s...'", thread_id, assistant_reply[:50]
+                )
         except Exception as e:
-            # Don't fail the message if naming fail
-            logger.warning(f"Failed to generate thread name for thread {thread_id}: {str(e)}")
-
+            if title_task is not None:
+                title_task.cancel()
+            logger.error(
+                "LLM run failed for thread %s: %s", thread_id, e,
+                exc_info=True
+            )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"LLM run failed: {str(e)}"
+            )
+        await cache_reply(llm_key, assistant_reply)
 
-    # 5. Run LLM
-    try:
-        logger.info(f"Running LLM for thread {thread_id}")
-        result = await Runner.run(
-            triage_agent, 
-            messages_for_llm, 
-            run_config=run_config
-        )
-        assistant_reply = str(result.final_output)
-        logger.info(
-            f"LLM response received for thread {thread_id}: '{assistant_reply[:50]}...'"
-        )
-    except Exception as e:
-        logger.error(
-            f"LLM run failed for thread {thread_id}: {str(e)}", 
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"LLM run failed: {str(e)}"
-        )
+    # 4.5. Save the thread name generated alongside the LLM call
+    if title_task is not None:
+        await _save_thread_title(thread_svc, thread_id, title_task)
 
-    # 6. Save assistant reply
+    # 5. Save user message and assistant reply in one INSERT
     try:
-        assistant_msg = await msg_svc.add_message(  # noqa: F841
-            thread_id=thread.id,
-            role="assistant",
-            content=assistant_reply
-        )
-        logger.info(f"Assistant message saved to thread {thread_id}")
+        new_messages = await msg_svc.add_messages(thread.id, [
+            ("user", payload.content),
+            ("assistant", assistant_reply),
+        ])
+        logger.info("User and assistant messages saved to thread %s", thread_id)
     except Exception as e:
         logger.error(
-            f"Error saving assistant message: {str(e)}", 
+            "Error saving messages: %s", e,
             exc_info=True
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to save AI response"
+            detail="Failed to save messages"
         )
 
-    # 7. Return response with updated history
+    # 6. Return response with updated history (rows already in memory, no re-query).
+    # Returning the response directly skips FastAPI's second validation pass.
     try:
-        history = await msg_svc.get_messages_for_thread(thread.id)
-        return ChatResponse(
+        chat = ChatResponse(
             response=assistant_reply,
             thread_id=thread.id,
-            history=[MessageOut.model_validate(m) for m in history]
+            history=_MSG_LIST_ADAPTER.validate_python(history + new_messages, from_attributes=True)
         )
+        return Response(content=chat.model_dump_json(), media_type="application/json")
     except Exception as e:
         logger.error(
-            f"Error formatting response: {str(e)}", 
+            "Error formatting response: %s", e,
             exc_info=True
         )
         raise HTTPException(
@@ -241,6 +321,91 @@ async def send_message(
             detail="Failed to format response"
         )
 
+@router.post(
+    "/{thread_id}/stream",
+    summary="Send a message (streaming)",
+    description="Send a message to a thread and stream the AI response as server-sent events",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Stream of ChatStreamChunk events", "content": {"text/event-stream": {}}},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not allowed to access this thread"},
+        404: {"description": "Thread not found"},
+        500: {"description": "Server error"}
+    }
+)
+async def stream_message(
+    thread_id: int = Path(..., description="ID of the thread"),
+    payload: MessageCreate = ...,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user),
+    run_config: RunConfig = Depends(get_agent_run_config)
+):
+    """
+    Send a message to a thread and stream the AI response token by token.
+    
+    Each event is a `data:` line holding a ChatStreamChunk. The user message
+    and the full AI response are saved in one INSERT once the model finishes,
+    before the final chunk (`is_final: true`) is sent.
+    
+    **Example:**
+    ```bash
+    curl -N -X POST "http://localhost:8000/messages/1/stream" \\
+         -H "Authorization: Bearer <token>" \\
+         -H "Content-Type: application/json" \\
+         -d '{"content": "Hello, AI!"}'
+    ```
+    """
+    thread_svc = ThreadService(db)
+    msg_svc = MessageService(db)
+    # Streaming never returns the history, so only role/content rows are loaded
+    thread, _, messages_for_llm, title_task = await _prepare_conversation(
+        thread_id, payload.content, thread_svc, msg_svc, current_user, run_config,
+        load_history=False
+    )
+
+    async def event_stream():
+        # The finally also runs when the client disconnects mid-stream
+        try:
+            parts: list[str] = []
+            llm_key = cache_key(GEMINI_MODEL, messages_for_llm)
+            cached = await get_cached_reply(llm_key)
+            try:
+                if cached is not None:
+                    parts.append(cached)
+                    yield _sse(ChatStreamChunk(content=cached))
+                else:
+                    result = Runner.run_streamed(triage_agent, messages_for_llm, run_config=run_config)
+                    async for event in result.stream_events():
+                        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                            parts.append(event.data.delta)
+                            yield _sse(ChatStreamChunk(content=event.data.delta))
+            except Exception as e:
+                logger.error("LLM stream failed for thread %s: %s", thread_id, e, exc_info=True)
+                yield _sse(ChatStreamChunk(content="LLM run failed", is_final=True))
+                return
+
+            assistant_reply = "".join(parts)
+            if cached is None:
+                await cache_reply(llm_key, assistant_reply)
+            if title_task is not None:
+                await _save_thread_title(thread_svc, thread_id, title_task)
+            try:
+                await msg_svc.add_messages(thread.id, [
+                    ("user", payload.content),
+                    ("assistant", assistant_reply),
+                ])
+                logger.info("Streamed reply saved to thread %s", thread_id)
+            except Exception as e:
+                logger.error("Error saving streamed messages: %s", e, exc_info=True)
+            yield _sse(ChatStreamChunk(content="", is_final=True))
+        finally:
+            if title_task is not None and not title_task.done():
+                title_task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.get(
     "/{thread_id}",
     response_model=List[MessageOut],
@@ -273,23 +438,31 @@ async def get_thread_history(
          -H "Authorization: Bearer <token>"
     ```
     """
-    thread_svc = ThreadService(db)
+    msg_svc = MessageService(db)
     
-    # 1. Verify thread exists
+    # Ownership check and message fetch in one query
     try:
-        thread = await thread_svc.get_thread_by_id(thread_id, load_session=True)  # noqa: F841
+        msgs = await msg_svc.get_messages_if_owner(thread_id, current_user.id)
     except ThreadNotFoundError:
-        logger.warning(f"Thread {thread_id} not found")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Thread not found"
         )
+    except ThreadAccessDeniedError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to access this thread"
+        )
     except Exception as e:
-        logger.error(f"Error retrieving thread {thread_id}: {str(e)}", exc_info=True)
+        logger.error("Error retrieving messages for thread %s: %s", thread_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while retrieving the thread"
         )
-    msg_svc = MessageService(db)
-    msgs = await msg_svc.get_messages_for_thread(thread_id)
-    return [MessageOut.from_orm(m) for m in msgs]
\ No newline at end of file
+    
+    return Response(
+        content=_MSG_LIST_ADAPTER.dump_json(
+            _MSG_LIST_ADAPTER.validate_python(msgs, from_attributes=True)
+        ),
+        media_type="application/json"
+    )
@@ -1,28 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Body
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Response, status, Path, Body
+from pydantic import TypeAdapter
 from typing import List
 import logging
 
 from app.schemas.schemas import ThreadCreate, ThreadOut
-from app.utils.db import get_db_session
-from app.routers.auth import get_current_user
-from app.services.thread_service import (
-    ThreadService,
-    ThreadNotFoundError,
-    ThreadCreationError,
-    ThreadAccessDeniedError
-)
-from app.services.session_service import (
-    SessionService,
-    SessionNotFoundError,
-    SessionAccessDeniedError
-)
-from app.models.models import User
+from app.utils.security import get_current_user_id
+from app.services.thread_service import ThreadService, get_thread_service
+from app.services.session_service import SessionService, get_session_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/threads", tags=["Threads"])
 
+# Built once; validates and serializes a whole list of ORM threads in one call
+_THREAD_LIST_ADAPTER = TypeAdapter(list[ThreadOut])
+
+_MAX_BATCH_THREADS = 100
+
 
 @router.post(
     "/{session_id}",
@@ -34,8 +28,8 @@ router = APIRouter(prefix="/threads", tags=["Threads"])
 async def create_thread(
     session_id: int = Path(..., description="ID of the session"),
     payload: ThreadCreate = Body(..., example={"title": "My Discussion Thread"}),
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    thread_svc: ThreadService = Depends(get_thread_service),
+    user_id: int = Depends(get_current_user_id)
 ):
     """
     Create a new thread in a session.
@@ -47,62 +41,54 @@ async def create_thread(
     **Returns:**
     - Created thread with ID and metadata
     """
-    session_svc = SessionService(db)
-    thread_svc = ThreadService(db)
+    # Ownership check and insert in one statement
+    logger.info(
+        "User %s creating thread in session %s", user_id, session_id
+    )
+    thread = await thread_svc.create_thread_for_user(
+        session_id=session_id,
+        user_id=user_id,
+        title=payload.title
+    )
+    logger.info(
+        "Thread created successfully: ID=%s, Session=%s, User=%s",
+        thread.id, session_id, user_id
+    )
+    return thread
+
+
+@router.post(
+    "/{session_id}/batch",
+    response_model=List[ThreadOut],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create threads in bulk",
+    description="Create several threads within a session in one request"
+)
+async def create_threads_batch(
+    session_id: int = Path(..., description="ID of the session"),
+    payload: List[ThreadCreate] = Body(..., min_length=1, max_length=_MAX_BATCH_THREADS),
+    thread_svc: ThreadService = Depends(get_thread_service),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Create several threads in a session at once.
     
-    try:
-        # Verify session exists and belongs to current user
-        logger.info(
-            f"User {current_user.id} creating thread in session {session_id}"
-        )
-        session = await session_svc.get_session_by_id(session_id, user_id=current_user.id)  # noqa: F841
-        
-    except SessionNotFoundError as e:
-        logger.warning(f"Session {session_id} not found for user {current_user.id}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-        
-    except SessionAccessDeniedError as e:
-        logger.warning(
-            f"User {current_user.id} denied access to session {session_id}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=str(e)
-        )
+    **Parameters:**
+    - **session_id**: ID of the session (must be owned by current user)
+    - **payload**: List of threads to create (at most 100)
     
-    # Create thread
-    try:
-        thread = await thread_svc.create_thread(
-            session_id=session_id, 
-            title=payload.title
-        )
-        logger.info(
-            f"Thread created successfully: ID={thread.id}, "
-            f"Session={session_id}, User={current_user.id}"
-        )
-        return thread
-        
-    except ThreadCreationError as e:
-        logger.error(
-            f"Failed to create thread in session {session_id}: {str(e)}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
-        
-    except Exception as e:
-        logger.error(
-            f"Unexpected error creating thread in session {session_id}: {str(e)}",
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred while creating the thread"
-        )
+    **Returns:**
+    - Created threads, in request order
+    """
+    logger.info(
+        "User %s creating %s threads in session %s", user_id, len(payload), session_id
+    )
+    threads = await thread_svc.create_threads_bulk(
+        session_id=session_id,
+        user_id=user_id,
+        titles=[t.title for t in payload]
+    )
+    return threads
 
 
 @router.get(
@@ -113,8 +99,9 @@ async def create_thread(
 )
 async def list_threads(
     session_id: int = Path(..., description="ID of the session"),
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    session_svc: SessionService = Depends(get_session_service),
+    thread_svc: ThreadService = Depends(get_thread_service),
+    user_id: int = Depends(get_current_user_id)
 ):
     """
     Get all threads in a session.
@@ -125,48 +112,21 @@ async def list_threads(
     **Returns:**
     - List of threads ordered by creation time
     """
-    session_svc = SessionService(db)
-    thread_svc = ThreadService(db)
-    
-    try:
-        # Verify session exists and belongs to current user
-        logger.info(f"User {current_user.id} listing threads in session {session_id}")
-        session = await session_svc.get_session_by_id(session_id, user_id=current_user.id)  # noqa: F841
-        
-    except SessionNotFoundError as e:
-        logger.warning(f"Session {session_id} not found for user {current_user.id}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-        
-    except SessionAccessDeniedError as e:
-        logger.warning(
-            f"User {current_user.id} denied access to session {session_id}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=str(e)
-        )
-    
-    # List threads
-    try:
-        threads = await thread_svc.list_threads_for_session(session_id)
-        logger.info(
-            f"Retrieved {len(threads)} threads for session {session_id}, "
-            f"User {current_user.id}"
-        )
-        return threads
-        
-    except Exception as e:
-        logger.error(
-            f"Error listing threads for session {session_id}: {str(e)}",
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred while retrieving threads"
-        )
+    # Verify session exists and belongs to current user
+    logger.info("User %s listing threads in session %s", user_id, session_id)
+    await session_svc.get_session_by_id(session_id, user_id=user_id)
+    
+    threads = await thread_svc.list_threads_for_session(session_id)
+    logger.info(
+        "Retrieved %s threads for session %s, User %s",
+        len(threads), session_id, user_id
+    )
+    return Response(
+        content=_THREAD_LIST_ADAPTER.dump_json(
+            _THREAD_LIST_ADAPTER.validate_python(threads, from_attributes=True)
+        ),
+        media_type="application/json"
+    )
 
 
 @router.get(
@@ -177,8 +137,8 @@ async def list_threads(
 )
 async def get_thread(
     thread_id: int = Path(..., description="ID of the thread"),
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    thread_svc: ThreadService = Depends(get_thread_service),
+    user_id: int = Depends(get_current_user_id)
 ):
     """
     Get a specific thread by ID.
@@ -189,38 +149,8 @@ async def get_thread(
     **Returns:**
     - Thread details
     """
-    thread_svc = ThreadService(db)
-    
-    try:
-        logger.info(f"User {current_user.id} requesting thread {thread_id}")
-        thread = await thread_svc.verify_thread_ownership(thread_id, current_user.id)
-        return thread
-        
-    except ThreadNotFoundError as e:
-        logger.warning(f"Thread {thread_id} not found")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-        
-    except ThreadAccessDeniedError as e:
-        logger.warning(
-            f"User {current_user.id} denied access to thread {thread_id}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=str(e)
-        )
-        
-    except Exception as e:
-        logger.error(
-            f"Error retrieving thread {thread_id}: {str(e)}",
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred"
-        )
+    logger.info("User %s requesting thread %s", user_id, thread_id)
+    return await thread_svc.verify_thread_ownership(thread_id, user_id)
 
 
 @router.patch(
@@ -232,8 +162,8 @@ async def get_thread(
 async def update_thread(
     thread_id: int = Path(..., description="ID of the thread"),
     title: str | None = Body(..., embed=True, description="New thread title"),
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    thread_svc: ThreadService = Depends(get_thread_service),
+    user_id: int = Depends(get_current_user_id)
 ):
     """
     Update a thread's title.
@@ -245,58 +175,27 @@ async def update_thread(
     **Returns:**
     - Updated thread
     """
-    thread_svc = ThreadService(db)
-    
-    try:
-        # Verify ownership
-        logger.info(
-            f"User {current_user.id} updating thread {thread_id} "
-            f"with title='{title}'"
-        )
-        await thread_svc.verify_thread_ownership(thread_id, current_user.id)
-        
-        # Update thread
-        thread = await thread_svc.update_thread_title(thread_id, title)
-        logger.info(f"Thread {thread_id} updated successfully")
-        return thread
-        
-    except ThreadNotFoundError as e:
-        logger.warning(f"Thread {thread_id} not found for update")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-        
-    except ThreadAccessDeniedError as e:
-        logger.warning(
-            f"User {current_user.id} denied update of thread {thread_id}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=str(e)
-        )
-        
-    except Exception as e:
-        logger.error(
-            f"Error updating thread {thread_id}: {str(e)}",
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred"
-        )
+    # Ownership check and update in one statement
+    logger.info(
+        "User %s updating thread %s with title='%s'",
+        user_id, thread_id, title
+    )
+    thread = await thread_svc.update_thread_title_if_owned(thread_id, user_id, title)
+    logger.info("Thread %s updated successfully", thread_id)
+    return thread
 
 
 @router.delete(
     "/thread/{thread_id}",
     status_code=status.HTTP_204_NO_CONTENT,
+    response_class=Response,
     summary="Delete thread",
     description="Delete a thread and all its messages"
 )
 async def delete_thread(
     thread_id: int = Path(..., description="ID of the thread"),
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    thread_svc: ThreadService = Depends(get_thread_service),
+    user_id: int = Depends(get_current_user_id)
 ):
     """
     Delete a thread and all its messages.
@@ -307,39 +206,8 @@ async def delete_thread(
     **Returns:**
     - 204 No Content on success
     """
-    thread_svc = ThreadService(db)
-    
-    try:
-        # Verify ownership
-        logger.info(f"User {current_user.id} deleting thread {thread_id}")
-        await thread_svc.verify_thread_ownership(thread_id, current_user.id)
-        
-        # Delete thread
-        await thread_svc.delete_thread(thread_id)
-        logger.info(f"Thread {thread_id} deleted by user {current_user.id}")
-        
-    except ThreadNotFoundError as e:
-        logger.warning(f"Thread {thread_id} not found for deletion")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-        
-    except ThreadAccessDeniedError as e:
-        logger.warning(
-            f"User {current_user.id} denied deletion of thread {thread_id}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=str(e)
-        )
-        
-    except Exception as e:
-        logger.error(
-            f"Error deleting thread {thread_id}: {str(e)}",
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred"
-        )
\ No newline at end of file
+    # Ownership check and delete in one statement
+    logger.info("User %s deleting thread %s", user_id, thread_id)
+    await thread_svc.delete_thread_if_owned(thread_id, user_id)
+    logger.info("Thread %s deleted by user %s", thread_id, user_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -18,7 +18,7 @@ class UserOut(BaseModel):
     is_verified: bool
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 
 class Token(BaseModel):
@@ -82,13 +82,6 @@ class ThreadOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class ThreadWithMessages(ThreadOut):
-    """Schema for thread with its messages"""
-    messages: List["MessageOut"] = []
-    
-    model_config = ConfigDict(from_attributes=True)
-
-
 # ---- Message ----
 class MessageCreate(BaseModel):
     """Schema for creating a new message"""
@@ -106,6 +99,13 @@ class MessageOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ThreadWithMessages(ThreadOut):
+    """Schema for thread with its messages"""
+    messages: List[MessageOut] = []
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
 class ChatRequest(BaseModel):
     """Schema for chat request"""
     message: str = Field(..., min_length=1, max_length=10000, description="User message")
@@ -1,17 +1,42 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta, timezone
 import secrets
 import logging
 
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import update, delete, func, bindparam
 from app.models.models import User, EmailVerificationToken
 from app.config import settings
+from app.utils.db import get_db_session
+from app.utils.smtp import get_smtp_pool
+from app.utils.user_cache import invalidate_user
+from app.utils.security import is_well_formed_token
 
 logger = logging.getLogger(__name__)
 
+# Built once; consumes a valid token and verifies its user in one statement:
+# WITH used AS (UPDATE tokens ... RETURNING user_id) UPDATE users ... RETURNING users
+_USED_TOKEN = (
+    update(EmailVerificationToken)
+    .where(
+        EmailVerificationToken.token == bindparam("token"),
+        EmailVerificationToken.used_at.is_(None),
+        EmailVerificationToken.expires_at > func.now(),
+    )
+    .values(used_at=func.now())
+    .returning(EmailVerificationToken.user_id)
+    .cte("used_token")
+)
+_VERIFY_USER_WITH_TOKEN = (
+    update(User)
+    .where(User.id == _USED_TOKEN.c.user_id)
+    .values(is_verified=True)
+    .returning(User)
+    .execution_options(synchronize_session=False)
+)
+
 
 # Custom Exceptions
 class EmailSendError(Exception):
@@ -33,7 +58,7 @@ class EmailService:
     @staticmethod
     def _send_email(to_email: str, subject: str, html_content: str, text_content: str):
         """
-        Send email using SMTP.
+        Send email using a pooled SMTP connection.
         
         Args:
             to_email: Recipient email address
@@ -59,20 +84,13 @@ class EmailService:
             message.attach(html_part)
             
             # Send email
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                if settings.SMTP_TLS:
-                    server.starttls()
-                
-                if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                    server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                
-                server.send_message(message)
+            get_smtp_pool().send_message(message)
             
             logger.info(f"Email sent successfully to {to_email}")
             
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {str(e)}", exc_info=True)
-            raise EmailSendError(f"Failed to send email: {str(e)}")
+            raise EmailSendError(f"Failed to send email: {str(e)}") from e
     
     async def generate_verification_token(self, user_id: int) -> str:
         """
@@ -112,12 +130,17 @@ class EmailService:
             )
             raise
     
-    async def send_verification_email(self, user: User, token: str):
+    @staticmethod
+    def send_verification_email(email: str, username: str, token: str):
         """
         Send verification email to user.
         
+        Takes only primitives (no ORM objects or session) so it can run
+        after the response as a background task.
+        
         Args:
-            user: User object
+            email: Recipient email address
+            username: Recipient username
             token: Verification token
             
         Raises:
@@ -153,7 +176,7 @@ class EmailService:
                     <h1>Welcome to Learning Mode Agent!</h1>
                 </div>
                 <div class="content">
-                    <h2>Hi {user.username},</h2>
+                    <h2>Hi {username},</h2>
                     <p>Thank you for registering! Please verify your email address to complete your registration.</p>
                     <p>Click the button below to verify your email:</p>
                     <div style="text-align: center;">
@@ -176,7 +199,7 @@ class EmailService:
         text_content = f"""
         Welcome to Learning Mode Agent!
         
-        Hi {user.username},
+        Hi {username},
         
         Thank you for registering! Please verify your email address to complete your registration.
         
@@ -192,8 +215,8 @@ class EmailService:
         
         subject = "Verify Your Email Address - Learning Mode Agent"
         
-        self._send_email(user.email, subject, html_content, text_content)
-        logger.info(f"Verification email sent to {user.email}")
+        EmailService._send_email(email, subject, html_content, text_content)
+        logger.info(f"Verification email sent to {email}")
     
     async def verify_email_token(self, token: str) -> User:
         """
@@ -208,42 +231,21 @@ class EmailService:
         Raises:
             VerificationTokenError: If token is invalid or expired
         """
+        # Malformed tokens can never match, skip the query
+        if not is_well_formed_token(token):
+            raise VerificationTokenError("Invalid or expired verification token")
+        
         try:
-            # Find token in database
-            stmt = select(EmailVerificationToken).where(
-                EmailVerificationToken.token == token
-            )
-            result = await self.db.execute(stmt)
-            verification_token = result.scalar_one_or_none()
-            
-            if not verification_token:
-                raise VerificationTokenError("Invalid verification token")
+            # Mark the token used and the user verified in one round trip
+            result = await self.db.scalars(_VERIFY_USER_WITH_TOKEN, {"token": token})
+            user = result.one_or_none()
             
-            # Check if token is expired
-            if verification_token.expires_at < datetime.now(timezone.utc):
-                raise VerificationTokenError("Verification token has expired")
-            
-            # Check if already used
-            if verification_token.used_at:
-                raise VerificationTokenError("Verification token has already been used")
-            
-            # Get user
-            user_stmt = select(User).where(User.id == verification_token.user_id)
-            user_result = await self.db.execute(user_stmt)
-            user = user_result.scalar_one_or_none()
-            
-            if not user:
-                raise VerificationTokenError("User not found")
-            
-            # Mark user as verified
-            user.is_verified = True
-            user.email_verified_at = datetime.now(timezone.utc)
-            
-            # Mark token as used
-            verification_token.used_at = datetime.now(timezone.utc)
+            if user is None:
+                # Unknown, used and expired tokens get the same answer
+                raise VerificationTokenError("Invalid or expired verification token")
             
             await self.db.commit()
-            await self.db.refresh(user)
+            await invalidate_user(user.email, user.username)
             
             logger.info(f"Email verified for user {user.id} ({user.email})")
             return user
@@ -255,44 +257,22 @@ class EmailService:
             logger.error(f"Error verifying email token: {str(e)}", exc_info=True)
             raise VerificationTokenError(f"Verification failed: {str(e)}")
     
-    async def resend_verification_email(self, user: User):
-        """
-        Resend verification email to user.
-        
-        Args:
-            user: User object
-            
-        Raises:
-            ValueError: If user is already verified
-            EmailSendError: If email sending fails
-        """
-        if user.is_verified:
-            raise ValueError("User email is already verified")
-        
-        # Generate new token
-        token = await self.generate_verification_token(user.id)
-        
-        # Send email
-        await self.send_verification_email(user, token)
-        
-        logger.info(f"Verification email resent to {user.email}")
-    
     async def delete_expired_tokens(self):
         """Delete expired verification tokens (cleanup task)"""
         try:
-            stmt = select(EmailVerificationToken).where(
+            stmt = delete(EmailVerificationToken).where(
                 EmailVerificationToken.expires_at < datetime.now(timezone.utc)
             )
             result = await self.db.execute(stmt)
-            expired_tokens = result.scalars().all()
-            
-            for token in expired_tokens:
-                await self.db.delete(token)
-            
             await self.db.commit()
             
-            logger.info(f"Deleted {len(expired_tokens)} expired verification tokens")
+            logger.info(f"Deleted {result.rowcount} expired verification tokens")
             
         except Exception as e:
             await self.db.rollback()
-            logger.error(f"Error deleting expired tokens: {str(e)}", exc_info=True)
\ No newline at end of file
+            logger.error(f"Error deleting expired tokens: {str(e)}", exc_info=True)
+
+
+def get_email_service(db: AsyncSession = Depends(get_db_session)) -> EmailService:
+    """Dependency that provides an EmailService bound to the request's session"""
+    return EmailService(db)
@@ -0,0 +1,61 @@
+import time
+import logging
+from typing import Callable
+
+from app.config import settings
+from app.services.email_service import EmailService, EmailSendError
+from app.services.password_reset_service import PasswordResetService
+
+logger = logging.getLogger(__name__)
+
+
+# Background jobs scheduled with FastAPI's BackgroundTasks. They run after the
+# response has been sent, take only primitives (never ORM objects or the
+# request's DB session) and are plain functions, so Starlette runs them in its
+# threadpool and the blocking SMTP calls never stall the event loop.
+
+def _send_with_retry(send: Callable[[], None], description: str) -> None:
+    """
+    Call send(), retrying failed deliveries with capped exponential backoff.
+    
+    Args:
+        send: Callable performing one delivery attempt
+        description: What is being sent (for logging)
+    """
+    max_attempts = max(1, settings.EMAIL_SEND_MAX_ATTEMPTS)
+    
+    for attempt in range(1, max_attempts + 1):
+        try:
+            send()
+            return
+        except EmailSendError as e:
+            if attempt == max_attempts:
+                logger.error(
+                    f"Giving up on {description} after {attempt} attempt(s): {str(e)}"
+                )
+                return
+            
+            delay = min(
+                settings.EMAIL_SEND_BACKOFF_SECONDS * 2 ** (attempt - 1),
+                settings.EMAIL_SEND_MAX_BACKOFF_SECONDS
+            )
+            logger.warning(
+                f"Attempt {attempt} to send {description} failed, retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+def send_verification_email_task(email: str, username: str, token: str) -> None:
+    """Deliver a verification email in the background"""
+    _send_with_retry(
+        lambda: EmailService.send_verification_email(email, username, token),
+        f"verification email to {email}"
+    )
+
+
+def send_password_reset_email_task(email: str, username: str, token: str) -> None:
+    """Deliver a password reset email in the background"""
+    _send_with_retry(
+        lambda: PasswordResetService.send_password_reset_email(email, username, token),
+        f"password reset email to {email}"
+    )
@@ -1,12 +1,55 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete, func, bindparam, and_
 from sqlalchemy.exc import IntegrityError
+from collections.abc import AsyncIterator
 import logging
 
-from app.models.models import Message
+from app.models.models import Message, Thread, UserSession
+from app.services.thread_service import ThreadNotFoundError, ThreadAccessDeniedError
 
 logger = logging.getLogger(__name__)
 
+# Built once; chronological order, id breaks ties between rows inserted together
+_MESSAGES_FOR_THREAD = (
+    select(Message)
+    .where(Message.thread_id == bindparam("thread_id"))
+    .order_by(Message.created_at.asc(), Message.id.asc())
+)
+
+# Rows fetched per round trip when streaming long threads
+_STREAM_BATCH = 500
+
+_MESSAGE_BY_ID = select(Message).where(Message.id == bindparam("message_id"))
+
+# Just what the LLM needs, as plain rows (no ORM objects to hydrate)
+_ROLE_CONTENT_FOR_THREAD = (
+    select(Message.role, Message.content)
+    .where(Message.thread_id == bindparam("thread_id"))
+    .order_by(Message.created_at.asc(), Message.id.asc())
+)
+
+# Newest `limit` messages, newest first (callers reverse them)
+_RECENT_ROLE_CONTENT_FOR_THREAD = (
+    select(Message.role, Message.content)
+    .where(Message.thread_id == bindparam("thread_id"))
+    .order_by(Message.created_at.desc(), Message.id.desc())
+    .limit(bindparam("limit"))
+)
+
+# Thread owner plus the thread's messages (only joined for the owner), in one
+# round trip; a thread without messages still yields one row with no message
+_OWNED_THREAD_MESSAGES = (
+    select(UserSession.user_id, Message)
+    .select_from(Thread)
+    .join(Thread.session)
+    .outerjoin(
+        Message,
+        and_(Message.thread_id == Thread.id, UserSession.user_id == bindparam("user_id")),
+    )
+    .where(Thread.id == bindparam("thread_id"))
+    .order_by(Message.created_at.asc(), Message.id.asc())
+)
+
 
 # Custom Exceptions
 class MessageCreationError(Exception):
@@ -51,7 +94,6 @@ class MessageService:
             )
             self.db.add(message)
             await self.db.commit()
-            await self.db.refresh(message)
             
             logger.info(
                 f"Message created: ID={message.id}, Thread={thread_id}, "
@@ -77,6 +119,69 @@ class MessageService:
             )
             raise MessageCreationError("Failed to create message")
 
+    async def bulk_create_messages(self, rows: list[dict]) -> list[Message]:
+        """
+        Insert several messages in a single multi-row INSERT ... RETURNING.
+        
+        Args:
+            rows: Message column values, e.g. {"thread_id": 1, "role": "user", "content": "..."}
+            
+        Returns:
+            Created messages, in the same order as rows
+            
+        Raises:
+            MessageCreationError: If message creation fails
+        """
+        try:
+            stmt = insert(Message).values(rows).returning(Message)
+            result = await self.db.scalars(stmt)
+            messages = list(result.all())
+            await self.db.commit()
+            
+            logger.info(f"Messages created: {len(messages)} rows in one INSERT")
+            return messages
+            
+        except IntegrityError as e:
+            await self.db.rollback()
+            logger.error(
+                f"Database integrity error creating messages: {str(e)}"
+            )
+            raise MessageCreationError(
+                "Failed to create messages due to database constraint. "
+                "Thread may not exist."
+            )
+            
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(
+                f"Unexpected error creating messages: {str(e)}", 
+                exc_info=True
+            )
+            raise MessageCreationError("Failed to create messages")
+
+    async def add_messages(
+        self, 
+        thread_id: int, 
+        items: list[tuple[str, str]]
+    ) -> list[Message]:
+        """
+        Append conversation turns to a thread in one INSERT and one commit.
+        
+        Args:
+            thread_id: ID of the thread
+            items: (role, content) pairs, in conversation order
+            
+        Returns:
+            Created messages, in the same order as items
+            
+        Raises:
+            MessageCreationError: If message creation fails
+        """
+        return await self.bulk_create_messages([
+            {"thread_id": thread_id, "role": role, "content": content}
+            for role, content in items
+        ])
+
     async def get_messages_for_thread(
         self, 
         thread_id: int
@@ -91,18 +196,13 @@ class MessageService:
             List of messages ordered by creation time (oldest first)
         """
         try:
-            stmt = (
-                select(Message)
-                .where(Message.thread_id == thread_id)
-                .order_by(Message.created_at.asc())  # Chronological order
-            )
-            result = await self.db.execute(stmt)
+            result = await self.db.execute(_MESSAGES_FOR_THREAD, {"thread_id": thread_id})
             messages = result.scalars().all()
             
             logger.info(
                 f"Retrieved {len(messages)} messages for thread {thread_id}"
             )
-            return list(messages)
+            return messages
             
         except Exception as e:
             logger.error(
@@ -111,6 +211,86 @@ class MessageService:
             )
             raise
 
+    async def get_role_content_for_llm(self, thread_id: int) -> list[dict]:
+        """
+        Get a thread's messages as LLM input, without loading Message objects.
+        
+        Args:
+            thread_id: ID of the thread
+            
+        Returns:
+            List of {"role", "content"} dicts ordered by creation time
+        """
+        try:
+            result = await self.db.execute(_ROLE_CONTENT_FOR_THREAD, {"thread_id": thread_id})
+            return [dict(row._mapping) for row in result]
+            
+        except Exception as e:
+            logger.error(
+                f"Error retrieving LLM input for thread {thread_id}: {str(e)}", 
+                exc_info=True
+            )
+            raise
+
+    async def iter_messages_for_thread(self, thread_id: int) -> AsyncIterator[Message]:
+        """
+        Stream a thread's messages, oldest first, in batches of _STREAM_BATCH rows.
+        
+        Memory stays bounded by the batch size however long the thread is.
+        
+        Args:
+            thread_id: ID of the thread
+            
+        Yields:
+            Messages ordered by creation time
+        """
+        result = await self.db.stream_scalars(
+            _MESSAGES_FOR_THREAD.execution_options(yield_per=_STREAM_BATCH),
+            {"thread_id": thread_id}
+        )
+        async for message in result:
+            yield message
+
+    async def get_messages_if_owner(self, thread_id: int, user_id: int) -> list[Message]:
+        """
+        Get all messages for a thread after checking the user owns it.
+        
+        Ownership check and message fetch share a single SELECT.
+        
+        Args:
+            thread_id: ID of the thread
+            user_id: ID of the user requesting the messages
+            
+        Returns:
+            List of messages ordered by creation time (oldest first)
+            
+        Raises:
+            ThreadNotFoundError: If thread doesn't exist
+            ThreadAccessDeniedError: If thread doesn't belong to user
+        """
+        result = await self.db.execute(
+            _OWNED_THREAD_MESSAGES, {"thread_id": thread_id, "user_id": user_id}
+        )
+        rows = result.all()
+        
+        if not rows:
+            logger.warning(f"Thread not found: ID={thread_id}")
+            raise ThreadNotFoundError(f"Thread with ID {thread_id} not found")
+        
+        owner_id = rows[0].user_id
+        if owner_id != user_id:
+            logger.warning(
+                f"Access denied: User {user_id} tried to access thread {thread_id} "
+                f"owned by user {owner_id}"
+            )
+            raise ThreadAccessDeniedError(
+                "You don't have permission to access this thread"
+            )
+        
+        messages = [row.Message for row in rows if row.Message is not None]
+        logger.info(f"Retrieved {len(messages)} messages for thread {thread_id}")
+        return messages
+
     async def get_message_by_id(self, message_id: int) -> Message:
         """
         Get a message by its ID.
@@ -125,8 +305,7 @@ class MessageService:
             MessageNotFoundError: If message doesn't exist
         """
         try:
-            stmt = select(Message).where(Message.id == message_id)
-            result = await self.db.execute(stmt)
+            result = await self.db.execute(_MESSAGE_BY_ID, {"message_id": message_id})
             message = result.scalar_one_or_none()
             
             if not message:
@@ -157,9 +336,12 @@ class MessageService:
             MessageNotFoundError: If message doesn't exist
         """
         try:
-            message = await self.get_message_by_id(message_id)
+            result = await self.db.execute(delete(Message).where(Message.id == message_id))
+            
+            if result.rowcount == 0:
+                logger.warning(f"Message not found: ID={message_id}")
+                raise MessageNotFoundError(f"Message with ID {message_id} not found")
             
-            await self.db.delete(message)
             await self.db.commit()
             
             logger.info(f"Message deleted: ID={message_id}")
@@ -185,8 +367,8 @@ class MessageService:
             Number of messages
         """
         try:
-            messages = await self.get_messages_for_thread(thread_id)
-            return len(messages)
+            stmt = select(func.count()).select_from(Message).where(Message.thread_id == thread_id)
+            return await self.db.scalar(stmt)
         except Exception as e:
             logger.error(
                 f"Error counting messages for thread {thread_id}: {str(e)}", 
@@ -210,16 +392,15 @@ class MessageService:
             List of messages in format: [{"role": "user", "content": "..."}, ...]
         """
         try:
-            messages = await self.get_messages_for_thread(thread_id)
-            
-            # Apply limit if specified (get most recent messages)
-            if limit is not None and len(messages) > limit:
-                messages = messages[-limit:]
-            
-            context = [
-                {"role": msg.role, "content": msg.content}
-                for msg in messages
-            ]
+            if limit is None:
+                context = await self.get_role_content_for_llm(thread_id)
+            else:
+                # Only the most recent messages leave the database
+                result = await self.db.execute(
+                    _RECENT_ROLE_CONTENT_FOR_THREAD, {"thread_id": thread_id, "limit": limit}
+                )
+                context = [dict(row._mapping) for row in result]
+                context.reverse()
             
             logger.info(
                 f"Generated conversation context for thread {thread_id}: "
@@ -253,17 +434,22 @@ class MessageService:
             MessageNotFoundError: If message doesn't exist
         """
         try:
-            message = await self.get_message_by_id(message_id)
+            stmt = (
+                update(Message)
+                .where(Message.id == message_id)
+                .values(content=new_content)
+                .returning(Message)
+            )
+            message = (await self.db.scalars(stmt)).one_or_none()
             
-            old_content = message.content
-            message.content = new_content
+            if message is None:
+                logger.warning(f"Message not found: ID={message_id}")
+                raise MessageNotFoundError(f"Message with ID {message_id} not found")
             
             await self.db.commit()
-            await self.db.refresh(message)
             
             logger.info(
-                f"Message updated: ID={message_id}, "
-                f"Old length={len(old_content)}, New length={len(new_content)}"
+                f"Message updated: ID={message_id}, New length={len(new_content)}"
             )
             return message
             
@@ -288,12 +474,8 @@ class MessageService:
             Number of messages deleted
         """
         try:
-            messages = await self.get_messages_for_thread(thread_id)
-            count = len(messages)
-            
-            for message in messages:
-                await self.db.delete(message)
-            
+            result = await self.db.execute(delete(Message).where(Message.thread_id == thread_id))
+            count = result.rowcount
             await self.db.commit()
             
             logger.info(
@@ -1,19 +1,31 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta, timezone
 import secrets
 import logging
 
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete, bindparam
 from app.models.models import User
 from app.models.models import PasswordResetToken
 from app.config import settings
-from app.utils.security import get_password_hash
+from app.utils.security import get_password_hash_async, is_well_formed_token
+from app.services.email_service import EmailService
+from app.utils.db import get_db_session
+from app.services.user_service import UserService, UserNotFoundError
+from app.utils.user_cache import invalidate_user
 
 logger = logging.getLogger(__name__)
 
+# Built once; hit on every reset link click and reset submission
+_TOKEN_BY_VALUE = select(PasswordResetToken).where(
+    PasswordResetToken.token == bindparam("token")
+)
+_TOKEN_WITH_USER = (
+    select(PasswordResetToken, User)
+    .join(User, User.id == PasswordResetToken.user_id)
+    .where(PasswordResetToken.token == bindparam("token"))
+)
+
 
 # Custom Exceptions
 class PasswordResetError(Exception):
@@ -26,11 +38,6 @@ class InvalidResetTokenError(Exception):
     pass
 
 
-class EmailSendError(Exception):
-    """Raised when email sending fails"""
-    pass
-
-
 class PasswordResetService:
     """Service for handling password reset functionality"""
     
@@ -40,46 +47,12 @@ class PasswordResetService:
     @staticmethod
     def _send_email(to_email: str, subject: str, html_content: str, text_content: str):
         """
-        Send email using SMTP.
+        Send email through the shared SMTP pool (see EmailService._send_email).
         
-        Args:
-            to_email: Recipient email address
-            subject: Email subject
-            html_content: HTML version of email
-            text_content: Plain text version of email
-            
         Raises:
             EmailSendError: If email sending fails
         """
-        try:
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = settings.SMTP_FROM_EMAIL
-            message["To"] = to_email
-            
-            # Attach plain text and HTML versions
-            text_part = MIMEText(text_content, "plain")
-            html_part = MIMEText(html_content, "html")
-            
-            message.attach(text_part)
-            message.attach(html_part)
-            
-            # Send email
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                if settings.SMTP_TLS:
-                    server.starttls()
-                
-                if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                    server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                
-                server.send_message(message)
-            
-            logger.info(f"Password reset email sent to {to_email}")
-            
-        except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {str(e)}", exc_info=True)
-            raise EmailSendError(f"Failed to send email: {str(e)}")
+        EmailService._send_email(to_email, subject, html_content, text_content)
     
     async def generate_reset_token(self, user_id: int) -> str:
         """
@@ -91,6 +64,7 @@ class PasswordResetService:
         Returns:
             Reset token string
         """
+        now = datetime.now(timezone.utc)
         try:
             # Invalidate any existing unused tokens for this user
             stmt = select(PasswordResetToken).where(
@@ -101,11 +75,11 @@ class PasswordResetService:
             existing_tokens = result.scalars().all()
             
             for token in existing_tokens:
-                token.used_at = datetime.now(timezone.utc)
+                token.used_at = now
             
             # Generate secure random token
             token = secrets.token_urlsafe(32)
-            expires_at = datetime.now(timezone.utc) + timedelta(
+            expires_at = now + timedelta(
                 hours=settings.PASSWORD_RESET_TOKEN_EXPIRE_HOURS
             )
             
@@ -130,12 +104,17 @@ class PasswordResetService:
             )
             raise
     
-    async def send_password_reset_email(self, user: User, token: str):
+    @staticmethod
+    def send_password_reset_email(email: str, username: str, token: str):
         """
         Send password reset email to user.
         
+        Takes only primitives (no ORM objects or session) so it can run
+        after the response as a background task.
+        
         Args:
-            user: User object
+            email: Recipient email address
+            username: Recipient username
             token: Reset token
             
         Raises:
@@ -177,7 +156,7 @@ class PasswordResetService:
                     <h1>🔐 Password Reset Request</h1>
                 </div>
                 <div class="content">
-                    <h2>Hi {user.username},</h2>
+                    <h2>Hi {username},</h2>
                     <p>We received a request to reset your password. If you made this request, click the button below to reset your password:</p>
                     <div style="text-align: center;">
                         <a href="{reset_url}" class="button">Reset Password</a>
@@ -208,7 +187,7 @@ class PasswordResetService:
         text_content = f"""
         Password Reset Request
         
-        Hi {user.username},
+        Hi {username},
         
         We received a request to reset your password. If you made this request, click the link below to reset your password:
         
@@ -228,8 +207,8 @@ class PasswordResetService:
         
         subject = "Reset Your Password - Learning Mode Agent"
         
-        self._send_email(user.email, subject, html_content, text_content)
-        logger.info(f"Password reset email sent to {user.email}")
+        PasswordResetService._send_email(email, subject, html_content, text_content)
+        logger.info(f"Password reset email sent to {email}")
     
     async def verify_reset_token(self, token: str) -> PasswordResetToken:
         """
@@ -244,25 +223,19 @@ class PasswordResetService:
         Raises:
             InvalidResetTokenError: If token is invalid, expired, or used
         """
+        # Malformed tokens can never match, skip the query
+        if not is_well_formed_token(token):
+            raise InvalidResetTokenError("Invalid reset token")
+        
         try:
             # Find token in database
-            stmt = select(PasswordResetToken).where(
-                PasswordResetToken.token == token
-            )
-            result = await self.db.execute(stmt)
+            result = await self.db.execute(_TOKEN_BY_VALUE, {"token": token})
             reset_token = result.scalar_one_or_none()
             
             if not reset_token:
                 raise InvalidResetTokenError("Invalid reset token")
             
-            # Check if token is expired
-            if reset_token.expires_at < datetime.now(timezone.utc):
-                raise InvalidResetTokenError("Reset token has expired")
-            
-            # Check if already used
-            if reset_token.used_at:
-                raise InvalidResetTokenError("Reset token has already been used")
-            
+            self._check_usable(reset_token, datetime.now(timezone.utc))
             return reset_token
             
         except InvalidResetTokenError:
@@ -271,6 +244,24 @@ class PasswordResetService:
             logger.error(f"Error verifying reset token: {str(e)}", exc_info=True)
             raise InvalidResetTokenError(f"Token verification failed: {str(e)}")
     
+    @staticmethod
+    def _check_usable(reset_token: PasswordResetToken, now: datetime) -> None:
+        """
+        Reject expired or already used tokens.
+        
+        Args:
+            reset_token: Token to check
+            now: Current time
+            
+        Raises:
+            InvalidResetTokenError: If token is expired or used
+        """
+        if reset_token.expires_at < now:
+            raise InvalidResetTokenError("Reset token has expired")
+        
+        if reset_token.used_at:
+            raise InvalidResetTokenError("Reset token has already been used")
+    
     async def reset_password(self, token: str, new_password: str) -> User:
         """
         Reset user password using token.
@@ -285,26 +276,31 @@ class PasswordResetService:
         Raises:
             InvalidResetTokenError: If token is invalid
         """
+        # Malformed tokens can never match, skip the query
+        if not is_well_formed_token(token):
+            raise InvalidResetTokenError("Invalid reset token")
+        
+        now = datetime.now(timezone.utc)
         try:
-            # Verify token
-            reset_token = await self.verify_reset_token(token)
+            # Token and its user in one query
+            result = await self.db.execute(_TOKEN_WITH_USER, {"token": token})
+            row = result.one_or_none()
             
-            # Get user
-            user_stmt = select(User).where(User.id == reset_token.user_id)
-            user_result = await self.db.execute(user_stmt)
-            user = user_result.scalar_one_or_none()
+            if row is None:
+                raise InvalidResetTokenError("Invalid reset token")
             
-            if not user:
-                raise InvalidResetTokenError("User not found")
+            reset_token, user = row
+            self._check_usable(reset_token, now)
             
             # Update password
-            user.password = get_password_hash(new_password)
+            user.password = await get_password_hash_async(new_password)
             
             # Mark token as used
-            reset_token.used_at = datetime.now(timezone.utc)
+            reset_token.used_at = now
             
             await self.db.commit()
             await self.db.refresh(user)
+            await invalidate_user(user.email, user.username)
             
             logger.info(f"Password reset successfully for user {user.id}")
             return user
@@ -316,42 +312,40 @@ class PasswordResetService:
             logger.error(f"Error resetting password: {str(e)}", exc_info=True)
             raise PasswordResetError(f"Password reset failed: {str(e)}")
     
-    async def request_password_reset(self, email: str) -> bool:
+    async def request_password_reset(self, email: str) -> tuple[User, str] | None:
         """
         Request password reset for a user by email.
         
+        Generates the reset token; delivering the email is left to the caller
+        (the router schedules it as a background task).
+        
         Args:
             email: User's email address
             
         Returns:
-            True if email was sent (or user doesn't exist but we don't reveal that)
+            (user, reset token), or None if no user has this email
             
         Note:
-            This method doesn't reveal whether the email exists for security reasons
+            Callers must not reveal whether the email exists
         """
         try:
             # Find user by email
-            stmt = select(User).where(User.email == email)
-            result = await self.db.execute(stmt)
-            user = result.scalar_one_or_none()
+            try:
+                user = await UserService(self.db).get_user_by_email(email)
+            except UserNotFoundError:
+                user = None
             
             if not user:
                 # Don't reveal that user doesn't exist
                 logger.info(f"Password reset requested for non-existent email: {email}")
-                return True
+                return None
             
             # Generate token
             token = await self.generate_reset_token(user.id)
             
-            # Send email
-            await self.send_password_reset_email(user, token)
+            logger.info(f"Password reset token issued for {email}")
+            return user, token
             
-            logger.info(f"Password reset email sent to {email}")
-            return True
-            
-        except EmailSendError as e:
-            logger.error(f"Failed to send password reset email: {str(e)}")
-            raise
         except Exception as e:
             logger.error(f"Error in password reset request: {str(e)}", exc_info=True)
             raise
@@ -359,19 +353,19 @@ class PasswordResetService:
     async def delete_expired_tokens(self):
         """Delete expired reset tokens (cleanup task)"""
         try:
-            stmt = select(PasswordResetToken).where(
+            stmt = delete(PasswordResetToken).where(
                 PasswordResetToken.expires_at < datetime.now(timezone.utc)
             )
             result = await self.db.execute(stmt)
-            expired_tokens = result.scalars().all()
-            
-            for token in expired_tokens:
-                await self.db.delete(token)
-            
             await self.db.commit()
             
-            logger.info(f"Deleted {len(expired_tokens)} expired password reset tokens")
+            logger.info(f"Deleted {result.rowcount} expired password reset tokens")
             
         except Exception as e:
             await self.db.rollback()
-            logger.error(f"Error deleting expired tokens: {str(e)}", exc_info=True)
\ No newline at end of file
+            logger.error(f"Error deleting expired tokens: {str(e)}", exc_info=True)
+
+
+def get_password_reset_service(db: AsyncSession = Depends(get_db_session)) -> PasswordResetService:
+    """Dependency that provides a PasswordResetService bound to the request's session"""
+    return PasswordResetService(db)
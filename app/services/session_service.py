@@ -1,8 +1,10 @@
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 import logging
 
+from app.utils.db import get_db_session
 from app.models.models import UserSession
 
 logger = logging.getLogger(__name__)
@@ -193,4 +195,9 @@ class SessionService:
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error updating session {session_id}: {str(e)}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+
+def get_session_service(db: AsyncSession = Depends(get_db_session)) -> SessionService:
+    """Dependency that provides a SessionService bound to the request's session"""
+    return SessionService(db)
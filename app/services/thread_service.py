@@ -1,14 +1,43 @@
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, delete, literal, bindparam, String
+from sqlalchemy.orm import joinedload, selectinload, raiseload
 from sqlalchemy.exc import IntegrityError
 import logging
 
-from app.models.models import Thread
+from app.utils.db import get_db_session
+from app.models.models import Thread, UserSession
+from app.services.session_service import SessionNotFoundError, SessionAccessDeniedError
 
 logger = logging.getLogger(__name__)
 
 
+def _owned_session_ids(user_id: int):
+    """Subquery of the IDs of a user's sessions, for ownership filters"""
+    return select(UserSession.id).where(UserSession.user_id == user_id)
+
+
+# Thread-by-id lookups, built once per (load_session, load_messages) combination;
+# anything not eagerly loaded raises instead of lazy loading
+_THREAD_BY_ID = select(Thread).where(Thread.id == bindparam("thread_id"))
+_THREAD_BY_ID_STMTS = {
+    (False, False): _THREAD_BY_ID.options(raiseload("*")),
+    (True, False): _THREAD_BY_ID.options(
+        joinedload(Thread.session, innerjoin=True),
+        raiseload("*"),
+    ),
+    (False, True): _THREAD_BY_ID.options(
+        selectinload(Thread.messages),
+        raiseload("*"),
+    ),
+    (True, True): _THREAD_BY_ID.options(
+        joinedload(Thread.session, innerjoin=True),
+        selectinload(Thread.messages),
+        raiseload("*"),
+    ),
+}
+
+
 # Custom Exceptions
 class ThreadNotFoundError(Exception):
     """Raised when thread is not found"""
@@ -74,17 +103,171 @@ class ThreadService:
             )
             raise ThreadCreationError("Failed to create thread")
 
+    async def create_thread_for_user(
+        self, 
+        session_id: int, 
+        user_id: int, 
+        title: str | None = None
+    ) -> Thread:
+        """
+        Create a new thread in a session owned by the user.
+        
+        The ownership check and the insert are one INSERT ... SELECT, so the
+        success path is a single round trip. Only when nothing is inserted is
+        the session looked up to tell "missing" from "not yours".
+        
+        Args:
+            session_id: ID of the session
+            user_id: ID of the user creating the thread
+            title: Optional title for the thread
+            
+        Returns:
+            Created thread
+            
+        Raises:
+            SessionNotFoundError: If session doesn't exist
+            SessionAccessDeniedError: If session doesn't belong to user
+            ThreadCreationError: If thread creation fails
+        """
+        try:
+            stmt = (
+                insert(Thread)
+                .from_select(
+                    ["session_id", "title"],
+                    select(UserSession.id, literal(title, String)).where(
+                        UserSession.id == session_id,
+                        UserSession.user_id == user_id,
+                    ),
+                )
+                .returning(Thread)
+            )
+            thread = (await self.db.scalars(stmt)).one_or_none()
+            
+            if thread is None:
+                raise await self._session_access_error(session_id, user_id)
+            
+            await self.db.commit()
+            
+            logger.info(
+                f"Thread created: ID={thread.id}, Session={session_id}, Title='{title}'"
+            )
+            return thread
+            
+        except (SessionNotFoundError, SessionAccessDeniedError):
+            raise
+            
+        except IntegrityError as e:
+            await self.db.rollback()
+            logger.error(f"Database integrity error creating thread: {str(e)}")
+            raise ThreadCreationError(
+                "Failed to create thread due to database constraint. "
+                "Session may not exist."
+            )
+            
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(
+                f"Unexpected error creating thread: {str(e)}", 
+                exc_info=True
+            )
+            raise ThreadCreationError("Failed to create thread")
+
+    async def create_threads_bulk(
+        self, 
+        session_id: int, 
+        user_id: int, 
+        titles: list[str | None]
+    ) -> list[Thread]:
+        """
+        Create several threads in a session owned by the user.
+        
+        All rows go in one executemany INSERT ... RETURNING (insertmanyvalues),
+        so the batch costs one round trip. session_id is a subquery on the
+        owned session, so a missing or foreign session inserts NULL and
+        fails the whole batch.
+        
+        Args:
+            session_id: ID of the session
+            user_id: ID of the user creating the threads
+            titles: Titles of the new threads (None for untitled)
+            
+        Returns:
+            Created threads, in the order of titles
+            
+        Raises:
+            SessionNotFoundError: If session doesn't exist
+            SessionAccessDeniedError: If session doesn't belong to user
+            ThreadCreationError: If thread creation fails
+        """
+        try:
+            owned_session_id = (
+                select(UserSession.id)
+                .where(UserSession.id == session_id, UserSession.user_id == user_id)
+                .scalar_subquery()
+            )
+            # sort_by_parameter_order returns rows in the order of titles;
+            # render_nulls keeps untitled rows in the same batch
+            stmt = (
+                insert(Thread)
+                .values(session_id=owned_session_id)
+                .returning(Thread, sort_by_parameter_order=True)
+                .execution_options(render_nulls=True)
+            )
+            threads = list(await self.db.scalars(stmt, [{"title": title} for title in titles]))
+            
+            await self.db.commit()
+            
+            logger.info(f"Created {len(threads)} threads in session {session_id}")
+            return threads
+            
+        except IntegrityError:
+            await self.db.rollback()
+            raise await self._session_access_error(session_id, user_id)
+            
+        except (SessionNotFoundError, SessionAccessDeniedError):
+            raise
+            
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(
+                f"Unexpected error creating threads: {str(e)}", 
+                exc_info=True
+            )
+            raise ThreadCreationError("Failed to create threads")
+
+    async def _session_access_error(self, session_id: int, user_id: int) -> Exception:
+        """
+        Explain why an ownership-filtered insert matched no session.
+        
+        Returns:
+            SessionNotFoundError or SessionAccessDeniedError, for the caller to raise
+        """
+        owner_id = await self.db.scalar(
+            select(UserSession.user_id).where(UserSession.id == session_id)
+        )
+        if owner_id is None:
+            logger.warning(f"Session not found: ID={session_id}")
+            return SessionNotFoundError(f"Session with ID {session_id} not found")
+        
+        logger.warning(
+            f"Access denied: User {user_id} tried to create a thread in "
+            f"session {session_id} owned by user {owner_id}"
+        )
+        return SessionAccessDeniedError("You don't have permission to access this session")
+
     async def get_thread_by_id(
         self, 
         thread_id: int, 
-        load_session: bool = False
+        load_session: bool = False,
+        load_messages: bool = False
     ) -> Thread:
         """
         Get a thread by its ID.
         
         Args:
             thread_id: ID of the thread
-            load_session: Whether to eagerly load the session relationship
+            load_session: Whether to eagerly load the session relationship (same query, via JOIN)
+            load_messages: Whether to batch-load the thread's messages (one extra SELECT)
             
         Returns:
             Thread object
@@ -93,12 +276,8 @@ class ThreadService:
             ThreadNotFoundError: If thread doesn't exist
         """
         try:
-            stmt = select(Thread).where(Thread.id == thread_id)
-            
-            if load_session:
-                stmt = stmt.options(selectinload(Thread.session))
-            
-            result = await self.db.execute(stmt)
+            stmt = _THREAD_BY_ID_STMTS[(load_session, load_messages)]
+            result = await self.db.execute(stmt, {"thread_id": thread_id})
             thread = result.scalar_one_or_none()
             
             if not thread:
@@ -185,6 +364,79 @@ class ThreadService:
             )
             raise
 
+    async def update_thread_title_if_owned(
+        self, 
+        thread_id: int, 
+        user_id: int, 
+        title: str | None
+    ) -> Thread:
+        """
+        Update the title of a thread owned by the user.
+        
+        Ownership check and UPDATE are a single statement; only when no row
+        matches is a second query made to tell "missing" from "not yours".
+        
+        Args:
+            thread_id: ID of the thread
+            user_id: ID of the user
+            title: New title
+            
+        Returns:
+            Updated thread
+            
+        Raises:
+            ThreadNotFoundError: If thread doesn't exist
+            ThreadAccessDeniedError: If thread doesn't belong to user
+        """
+        try:
+            stmt = (
+                update(Thread)
+                .where(Thread.id == thread_id, Thread.session_id.in_(_owned_session_ids(user_id)))
+                .values(title=title)
+                .returning(Thread)
+            )
+            thread = (await self.db.scalars(stmt)).one_or_none()
+            
+            if thread is None:
+                raise await self._access_error(thread_id, user_id)
+            
+            await self.db.commit()
+            
+            logger.info(f"Thread updated: ID={thread_id}, Title='{title}'")
+            return thread
+            
+        except (ThreadNotFoundError, ThreadAccessDeniedError):
+            raise
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(
+                f"Error updating thread {thread_id}: {str(e)}", 
+                exc_info=True
+            )
+            raise
+
+    async def _access_error(self, thread_id: int, user_id: int) -> Exception:
+        """
+        Explain why an ownership-filtered statement matched no thread.
+        
+        Returns:
+            ThreadNotFoundError or ThreadAccessDeniedError, for the caller to raise
+        """
+        owner_id = await self.db.scalar(
+            select(UserSession.user_id)
+            .join(Thread, Thread.session_id == UserSession.id)
+            .where(Thread.id == thread_id)
+        )
+        if owner_id is None:
+            logger.warning(f"Thread not found: ID={thread_id}")
+            return ThreadNotFoundError(f"Thread with ID {thread_id} not found")
+        
+        logger.warning(
+            f"Access denied: User {user_id} tried to access thread {thread_id} "
+            f"owned by user {owner_id}"
+        )
+        return ThreadAccessDeniedError("You don't have permission to access this thread")
+
     
     async def delete_thread(self, thread_id: int) -> None:
         """
@@ -214,6 +466,45 @@ class ThreadService:
             )
             raise
 
+    async def delete_thread_if_owned(self, thread_id: int, user_id: int) -> None:
+        """
+        Delete a thread owned by the user, along with its messages.
+        
+        Ownership check and DELETE are a single statement (messages go with
+        it through ON DELETE CASCADE); only when no row matches is a second
+        query made to tell "missing" from "not yours".
+        
+        Args:
+            thread_id: ID of the thread to delete
+            user_id: ID of the user
+            
+        Raises:
+            ThreadNotFoundError: If thread doesn't exist
+            ThreadAccessDeniedError: If thread doesn't belong to user
+        """
+        try:
+            stmt = delete(Thread).where(
+                Thread.id == thread_id, Thread.session_id.in_(_owned_session_ids(user_id))
+            )
+            result = await self.db.execute(stmt)
+            
+            if result.rowcount == 0:
+                raise await self._access_error(thread_id, user_id)
+            
+            await self.db.commit()
+            
+            logger.info(f"Thread deleted: ID={thread_id}")
+            
+        except (ThreadNotFoundError, ThreadAccessDeniedError):
+            raise
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(
+                f"Error deleting thread {thread_id}: {str(e)}", 
+                exc_info=True
+            )
+            raise
+
 
     async def verify_thread_ownership(
         self, 
@@ -255,4 +546,9 @@ class ThreadService:
                 f"Error verifying thread ownership {thread_id}: {str(e)}", 
                 exc_info=True
             )
-            raise
\ No newline at end of file
+            raise
+
+
+def get_thread_service(db: AsyncSession = Depends(get_db_session)) -> ThreadService:
+    """Dependency that provides a ThreadService bound to the request's session"""
+    return ThreadService(db)
@@ -1,9 +1,19 @@
+import time
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from app.models.models import User
+from app.utils.db import get_db_session
+from app.config import settings
 from app.schemas.schemas import UserCreate, UserOut
-from app.utils.security import get_password_hash, verify_password, create_access_token
+from app.utils.security import get_password_hash_async, verify_password_async, create_access_token
+from app.utils.user_cache import get_cached_user, cache_user, invalidate_user
+from app.utils.cache import get_redis
+from app.utils.email_filter import remember_email
+
+# Tokens issued to the same user within one bucket are reused from Redis
+TOKEN_CACHE_BUCKET_SECONDS = 60
 
 
 class UserAlreadyExistsError(Exception):
@@ -47,7 +57,7 @@ class UserService:
             raise UserAlreadyExistsError(f"Email '{user_data.email}' already exists")
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         new_user = User(
             username=user_data.username,
             email=user_data.email,
@@ -63,6 +73,8 @@ class UserService:
             await self.db.rollback()
             raise UserAlreadyExistsError("User with this username or email already exists")
         
+        await invalidate_user(new_user.email, new_user.username)
+        await remember_email(new_user.email)
         return new_user
 
     async def authenticate_user(self, username: str, password: str) -> User:
@@ -72,17 +84,12 @@ class UserService:
         Raises:
             InvalidCredentialsError: If credentials are invalid
         """
-        from app.config import settings  # noqa: F401
-        
-        result = await self.db.execute(
-            select(User).where(User.username == username)
-        )
-        user = result.scalar_one_or_none()
-        
-        if not user:
+        try:
+            user = await self.get_user_by_username(username)
+        except UserNotFoundError:
             raise InvalidCredentialsError("Incorrect username or password")
         
-        if not verify_password(password, user.password):
+        if not await verify_password_async(password, user.password):
             raise InvalidCredentialsError("Incorrect username or password")
         
         # Optionally check email verification
@@ -112,11 +119,15 @@ class UserService:
 
     async def get_user_by_username(self, username: str) -> User:
         """
-        Get user by username.
+        Get user by username (served from the user cache when possible).
         
         Raises:
             UserNotFoundError: If user not found
         """
+        user = await get_cached_user(self.db, "username", username)
+        if user:
+            return user
+        
         result = await self.db.execute(
             select(User).where(User.username == username)
         )
@@ -125,15 +136,20 @@ class UserService:
         if not user:
             raise UserNotFoundError(f"User '{username}' not found")
         
+        await cache_user(user)
         return user
 
     async def get_user_by_email(self, email: str) -> User:
         """
-        Get user by email.
+        Get user by email (served from the user cache when possible).
         
         Raises:
             UserNotFoundError: If user not found
         """
+        user = await get_cached_user(self.db, "email", email)
+        if user:
+            return user
+        
         result = await self.db.execute(
             select(User).where(User.email == email)
         )
@@ -142,13 +158,44 @@ class UserService:
         if not user:
             raise UserNotFoundError(f"User with email '{email}' not found")
         
+        await cache_user(user)
         return user
 
     async def create_token_for_user(self, user: User) -> str:
-        """Create JWT token for user"""
+        """
+        Create JWT token for user.
+        
+        Repeated logins by the same user within TOKEN_CACHE_BUCKET_SECONDS get
+        the token already issued for that window (when Redis is configured).
+        """
+        redis = get_redis()
+        bucket = int(time.time() // TOKEN_CACHE_BUCKET_SECONDS)
+        key = f"jwt:{user.id}:{bucket}"
+        
+        if redis is not None:
+            try:
+                cached = await redis.get(key)
+                if cached:
+                    return cached.decode()
+            except Exception:
+                redis = None
+        
         token_data = {
             "sub": user.username,
             "user_id": user.id,
             "email": user.email
         }
-        return create_access_token(data=token_data)
\ No newline at end of file
+        token = create_access_token(data=token_data)
+        
+        if redis is not None:
+            try:
+                await redis.setex(key, TOKEN_CACHE_BUCKET_SECONDS, token)
+            except Exception:
+                pass
+        
+        return token
+
+
+def get_user_service(db: AsyncSession = Depends(get_db_session)) -> UserService:
+    """Dependency that provides a UserService bound to the request's session"""
+    return UserService(db)
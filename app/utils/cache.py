@@ -0,0 +1,40 @@
+import logging
+
+from redis.asyncio import Redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis: Redis | None = None
+
+
+def get_redis() -> Redis | None:
+    """
+    Return the process-wide Redis client, or None when REDIS_URL is not set.
+    
+    The client connects lazily on first command and keeps its own
+    connection pool, so this is cheap to call on every request.
+    """
+    global _redis
+    
+    if not settings.REDIS_URL:
+        return None
+    
+    if _redis is None:
+        _redis = Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client (called on app shutdown)"""
+    global _redis
+    
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+        logger.info("Redis connections closed")
@@ -1,16 +1,43 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import DeclarativeBase, MappedAsDataclass
+from sqlalchemy.pool import NullPool
 from app.config import settings
 
-# Create Base for models
-Base = declarative_base()
 
-# Create async engine
+class Base(MappedAsDataclass, DeclarativeBase, kw_only=True, eq=False):
+    """
+    Declarative base for all models.
+
+    Models are mapped as dataclasses: columns are declared once with typed
+    Mapped[...] annotations and instances get a generated keyword-only
+    __init__. eq=False keeps identity-based hashing, which the ORM's
+    identity map relies on.
+    """
+
+# Driver specific connect arguments
+connect_args = {}
+if settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+    connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+# Pool settings; NullPool leaves pooling to an external pooler such as PgBouncer
+if settings.DB_USE_NULL_POOL:
+    pool_kwargs = {"poolclass": NullPool}
+else:
+    pool_kwargs = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+# Create async engine (one pool per process, drained in close_db)
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     future=True,
     pool_pre_ping=True,
+    connect_args=connect_args,
+    **pool_kwargs,
 )
 
 # Create async session factory
@@ -37,7 +64,16 @@ async def get_db_session():
 
 
 async def init_db():
-    """Initialize database - create all tables"""
+    """
+    Initialize database - create all tables.
+
+    Only runs for local development with DEBUG on; every other environment
+    gets its schema from Alembic migrations, so workers boot without
+    touching the catalog.
+    """
+    if settings.ENV != "development" or not settings.DEBUG:
+        return
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
@@ -0,0 +1,102 @@
+import hashlib
+import logging
+
+from redis.exceptions import ResponseError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import User
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# RedisBloom filter of known email addresses (sha256 of the lowercased address)
+_FILTER_KEY = "emails:bloom"
+# Set once the filter holds every existing user; until then lookups fall through
+_READY_KEY = "emails:bloom:ready"
+_ERROR_RATE = 0.001
+_CAPACITY = 1_000_000
+_BACKFILL_BATCH = 1000
+
+# Cleared when the Redis server has no RedisBloom module
+_available = True
+
+
+def _digest(email: str) -> bytes:
+    return hashlib.sha256(email.strip().lower().encode()).digest()
+
+
+async def init_email_filter(db: AsyncSession) -> None:
+    """
+    Create the filter and backfill it with every registered email.
+
+    Only the worker that creates the filter backfills it; the others see it
+    already exists. Does nothing when Redis is not configured.
+    """
+    global _available
+
+    redis = get_redis()
+    if redis is None:
+        return
+
+    try:
+        await redis.execute_command("BF.RESERVE", _FILTER_KEY, _ERROR_RATE, _CAPACITY)
+    except ResponseError as e:
+        if "exists" in str(e):
+            return
+        _available = False
+        logger.warning(f"Email filter disabled (RedisBloom unavailable): {str(e)}")
+        return
+    except Exception as e:
+        logger.warning(f"Email filter setup failed: {str(e)}")
+        return
+
+    try:
+        count = 0
+        result = await db.stream_scalars(
+            select(User.email).execution_options(yield_per=_BACKFILL_BATCH)
+        )
+        async for emails in result.partitions():
+            await redis.execute_command("BF.MADD", _FILTER_KEY, *map(_digest, emails))
+            count += len(emails)
+        await redis.set(_READY_KEY, 1)
+        logger.info(f"Email filter backfilled with {count} addresses")
+    except Exception as e:
+        # Leave the ready flag unset so lookups keep going to the database
+        logger.warning(f"Email filter backfill failed: {str(e)}")
+
+
+async def remember_email(email: str) -> None:
+    """Add a newly registered email to the filter"""
+    redis = get_redis()
+    if redis is None or not _available:
+        return
+
+    try:
+        await redis.execute_command("BF.ADD", _FILTER_KEY, _digest(email))
+    except Exception as e:
+        logger.warning(f"Email filter update failed: {str(e)}")
+
+
+async def email_might_exist(email: str) -> bool:
+    """
+    Check whether an email may belong to a registered user.
+
+    False means the email is definitely unknown and the database lookup can
+    be skipped. Any doubt (no Redis, no RedisBloom, filter not backfilled yet,
+    Redis errors) returns True so callers fall back to the database.
+    """
+    redis = get_redis()
+    if redis is None or not _available:
+        return True
+
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.exists(_READY_KEY)
+            pipe.execute_command("BF.EXISTS", _FILTER_KEY, _digest(email))
+            ready, present = await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Email filter read failed: {str(e)}")
+        return True
+
+    return not ready or bool(present)
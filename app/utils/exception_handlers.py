@@ -0,0 +1,39 @@
+from fastapi import FastAPI, Request, status
+from fastapi.responses import ORJSONResponse
+
+from app.services.session_service import SessionNotFoundError, SessionAccessDeniedError
+from app.services.thread_service import (
+    ThreadNotFoundError,
+    ThreadAccessDeniedError,
+    ThreadCreationError
+)
+
+# Service exceptions that map straight to an HTTP status. Client errors use
+# str(exc) as detail; server errors get a fixed detail (the service logs them)
+_STATUS_FOR_ERROR: dict[type[Exception], int] = {
+    SessionNotFoundError: status.HTTP_404_NOT_FOUND,
+    SessionAccessDeniedError: status.HTTP_403_FORBIDDEN,
+    ThreadNotFoundError: status.HTTP_404_NOT_FOUND,
+    ThreadAccessDeniedError: status.HTTP_403_FORBIDDEN,
+    ThreadCreationError: status.HTTP_500_INTERNAL_SERVER_ERROR,
+}
+
+
+async def _service_error_handler(request: Request, exc: Exception) -> ORJSONResponse:
+    status_code = _STATUS_FOR_ERROR[type(exc)]
+    if status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+        detail = "An unexpected error occurred"
+    else:
+        detail = str(exc)
+    return ORJSONResponse(status_code=status_code, content={"detail": detail})
+
+
+def register_exception_handlers(app: FastAPI) -> None:
+    """
+    Map service exceptions to HTTP responses once for the whole app.
+
+    Routers can let these exceptions propagate instead of repeating
+    try/except blocks that translate them into HTTPException.
+    """
+    for exc_class in _STATUS_FOR_ERROR:
+        app.add_exception_handler(exc_class, _service_error_handler)
@@ -0,0 +1,50 @@
+import hashlib
+import logging
+
+import orjson
+
+from app.config import settings
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, messages: list[dict]) -> str | None:
+    """
+    Key for an LLM reply to exactly this model and conversation.
+
+    Returns:
+        The key, or None when reply caching is disabled
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    digest = hashlib.sha256(orjson.dumps(messages)).hexdigest()
+    return f"llm:{model}:{digest}"
+
+
+async def get_cached_reply(key: str | None) -> str | None:
+    """Return a cached reply, or None on a miss (or when caching is unavailable)"""
+    redis = get_redis()
+    if key is None or redis is None:
+        return None
+
+    try:
+        raw = await redis.get(key)
+    except Exception as e:
+        logger.warning(f"LLM cache read failed: {str(e)}")
+        return None
+
+    return raw.decode() if raw is not None else None
+
+
+async def cache_reply(key: str | None, reply: str) -> None:
+    """Store a reply for LLM_CACHE_TTL_SECONDS"""
+    redis = get_redis()
+    if key is None or redis is None:
+        return
+
+    try:
+        await redis.setex(key, settings.LLM_CACHE_TTL_SECONDS, reply)
+    except Exception as e:
+        logger.warning(f"LLM cache write failed: {str(e)}")
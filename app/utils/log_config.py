@@ -0,0 +1,49 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from app.config import settings
+
+_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_queue_handler: QueueHandler | None = None
+_listener: QueueListener | None = None
+
+
+def setup_logging() -> None:
+    """
+    Route application logs through a queue drained by a background thread.
+
+    Request handlers only enqueue records; formatting and the write to
+    stderr happen on the listener thread, off the event loop.
+    """
+    global _queue_handler, _listener
+
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(_FORMAT))
+
+    _queue_handler = QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL)
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and detach the queue handler (called on app shutdown)"""
+    global _queue_handler, _listener
+
+    if _listener is None:
+        return
+
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    _queue_handler = None
+    _listener = None
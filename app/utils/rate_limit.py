@@ -0,0 +1,77 @@
+import time
+import logging
+from typing import Callable
+
+from fastapi import Depends, HTTPException, status
+
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Fallback fixed-window counters used when Redis is not configured:
+# key -> (count, window end as monotonic time). Per process only.
+_local_windows: dict[str, tuple[int, float]] = {}
+_LOCAL_MAX_KEYS = 10_000
+
+
+def _hit_local(key: str, window: int) -> int:
+    """Count a hit in the in-process window for key and return the new count"""
+    now = time.monotonic()
+    
+    if len(_local_windows) >= _LOCAL_MAX_KEYS:
+        # Drop expired windows so the table can't grow without bound
+        for stale in [k for k, (_, end) in _local_windows.items() if end <= now]:
+            del _local_windows[stale]
+    
+    count, end = _local_windows.get(key, (0, 0.0))
+    if end <= now:
+        count, end = 0, now + window
+    
+    count += 1
+    _local_windows[key] = (count, end)
+    return count
+
+
+async def _hit(key: str, window: int) -> int:
+    """Count a hit for key in the current window and return the new count"""
+    redis = get_redis()
+    if redis is None:
+        return _hit_local(key, window)
+    
+    try:
+        # One MULTI: start the window with its TTL if the key is new, then count
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, 0, ex=window, nx=True)
+            pipe.incr(key)
+            _, count = await pipe.execute()
+        return count
+    except Exception as e:
+        logger.warning(f"Rate limit check failed, using local counter: {str(e)}")
+        return _hit_local(key, window)
+
+
+def rate_limit(key_fn: Callable[..., str], limit: int = 1, window: int = 60):
+    """
+    Build a dependency allowing at most `limit` calls per `window` seconds per key.
+    
+    Args:
+        key_fn: Dependency returning the rate limit key for the request
+            (e.g. derived from the submitted email)
+        limit: Allowed calls per window
+        window: Window length in seconds
+        
+    Returns:
+        Dependency raising HTTP 429 once the limit is exceeded
+    """
+    async def dependency(key: str = Depends(key_fn)) -> None:
+        count = await _hit(f"ratelimit:{key}", window)
+        
+        if count > limit:
+            logger.warning(f"Rate limit exceeded for {key}")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests. Please try again later.",
+                headers={"Retry-After": str(window)},
+            )
+    
+    return dependency
@@ -1,58 +1,94 @@
 # app/utils/security.py
+import asyncio
 import os
-from dotenv import load_dotenv
+import re
 from passlib.context import CryptContext
-from datetime import datetime, timedelta
-from jose import jwt, JWTError
+from datetime import datetime, timedelta, timezone
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.config import settings
 from app.utils.db import get_db_session
 from app.models.models import User
 
-load_dotenv()
+# Resolved once at import instead of on every encode/decode
+SECRET_KEY_BYTES: bytes = settings.SECRET_KEY.encode()
+ALGORITHM = settings.ALGORITHM
+ACCESS_TOKEN_EXPIRE = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-SECRET_KEY = os.getenv("SECRET_KEY", "SUPERSECRET")
-ALGORITHM = os.getenv("ALGORITHM","HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
-
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Shape of emailed one-time tokens (secrets.token_urlsafe(32) is 43 chars)
+_ONE_TIME_TOKEN_RE = re.compile(r"[A-Za-z0-9_\-]{43,128}")
+
+# argon2 is CPU-bound; run it in worker threads, at most one per core at a time
+_HASH_SEMAPHORE = asyncio.Semaphore(os.cpu_count() or 1)
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password off the event loop"""
+    async with _HASH_SEMAPHORE:
+        return await asyncio.to_thread(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password off the event loop"""
+    async with _HASH_SEMAPHORE:
+        return await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
+
+def is_well_formed_token(token: str) -> bool:
+    """Cheap shape check for verification/reset tokens before any DB lookup"""
+    return _ONE_TIME_TOKEN_RE.fullmatch(token) is not None
+
 def create_access_token(*, data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    expire = datetime.now(timezone.utc) + (expires_delta or ACCESS_TOKEN_EXPIRE)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, SECRET_KEY_BYTES, algorithm=ALGORITHM)
 
 def decode_token(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY_BYTES, algorithms=[ALGORITHM])
         return payload
-    except JWTError:
+    except jwt.InvalidTokenError:
         return None
 
-async def get_current_user(db: AsyncSession = Depends(get_db_session), token: str = Depends(oauth2_scheme)) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """
+    Authenticated user's ID, straight from the JWT claim without a DB query.
+    
+    Enough for routes whose queries only filter on user_id; use
+    get_current_user when the User row itself is needed.
+    """
     payload = decode_token(token)
     if not payload:
-        raise credentials_exception
+        raise _credentials_exception()
     user_id = payload.get("user_id")
     if not user_id:
-        raise credentials_exception
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+        raise _credentials_exception()
+    return int(user_id)
+
+async def get_current_user(db: AsyncSession = Depends(get_db_session), user_id: int = Depends(get_current_user_id)) -> User:
+    result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalars().first()
     if not user:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
@@ -0,0 +1,135 @@
+import queue
+import smtplib
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledConnection:
+    """An SMTP connection plus the usage counters used to rotate it"""
+    
+    __slots__ = ("server", "created_at", "sent")
+    
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.created_at = time.monotonic()
+        self.sent = 0
+    
+    def expired(self) -> bool:
+        return (
+            self.sent >= settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+            or time.monotonic() - self.created_at >= settings.SMTP_MAX_CONNECTION_AGE_SECONDS
+        )
+
+
+class SMTPConnectionPool:
+    """
+    Small thread-safe pool of authenticated SMTP connections.
+    
+    Emails are sent from worker threads (background tasks), so the pool is
+    synchronous. Reusing a connection skips the TCP + STARTTLS + AUTH
+    handshake on every send. Connections are rotated after
+    SMTP_MAX_MESSAGES_PER_CONNECTION sends or SMTP_MAX_CONNECTION_AGE_SECONDS.
+    """
+    
+    def __init__(self, max_size: int = settings.SMTP_POOL_SIZE):
+        self._idle: queue.LifoQueue[_PooledConnection] = queue.LifoQueue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    @staticmethod
+    def _connect() -> _PooledConnection:
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=10)
+        try:
+            if settings.SMTP_TLS:
+                server.starttls()
+            
+            if settings.SMTP_USER and settings.SMTP_PASSWORD:
+                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        return _PooledConnection(server)
+    
+    @staticmethod
+    def _discard(conn: _PooledConnection) -> None:
+        try:
+            conn.server.quit()
+        except Exception:
+            conn.server.close()
+    
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """Borrow a connection; it is returned to the pool unless the send failed"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        
+        try:
+            yield conn.server
+        except Exception:
+            # Connection state is unknown after a failure, don't reuse it
+            self._discard(conn)
+            raise
+        
+        conn.sent += 1
+        with self._lock:
+            if self._closed or conn.expired():
+                self._discard(conn)
+                return
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                self._discard(conn)
+    
+    def send_message(self, message) -> None:
+        """Send a message, retrying once on a fresh connection if a pooled one went stale"""
+        try:
+            with self.connection() as server:
+                server.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            with self.connection() as server:
+                server.send_message(message)
+    
+    def close(self) -> None:
+        """Close all idle connections"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+_pool: SMTPConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Return the process-wide SMTP connection pool"""
+    global _pool
+    
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPConnectionPool()
+    return _pool
+
+
+def close_smtp_pool() -> None:
+    """Close pooled SMTP connections (called on app shutdown)"""
+    global _pool
+    
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+            logger.info("SMTP connections closed")
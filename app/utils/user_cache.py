@@ -0,0 +1,95 @@
+from datetime import datetime
+import logging
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.models.models import User
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Columns stored in the cache. The password is already a one-way argon2 hash
+# and is needed by login.
+_CACHED_FIELDS = ("id", "username", "email", "password", "is_verified")
+
+
+def _key(field: str, value: str) -> str:
+    return f"user:{field}:{value}"
+
+
+def _dump(user: User) -> bytes:
+    data = {name: getattr(user, name) for name in _CACHED_FIELDS}
+    data["created_at"] = user.created_at
+    data["updated_at"] = user.updated_at
+    return orjson.dumps(data)
+
+
+async def get_cached_user(db: AsyncSession, field: str, value: str) -> User | None:
+    """
+    Look up a user in the cache by "email" or "username".
+    
+    A hit is attached to the given session as a persistent instance without
+    querying the database.
+    
+    Returns:
+        The cached user, or None on a miss (or when Redis is unavailable)
+    """
+    redis = get_redis()
+    if redis is None:
+        return None
+    
+    try:
+        raw = await redis.get(_key(field, value))
+    except Exception as e:
+        logger.warning(f"User cache read failed: {str(e)}")
+        return None
+    
+    if raw is None:
+        return None
+    
+    data = orjson.loads(raw)
+    user = User(
+        username=data["username"],
+        email=data["email"],
+        password=data["password"],
+        is_verified=data["is_verified"],
+    )
+    user.id = data["id"]
+    user.created_at = datetime.fromisoformat(data["created_at"]) if data["created_at"] else None
+    user.updated_at = datetime.fromisoformat(data["updated_at"]) if data["updated_at"] else None
+    
+    # Reuse an instance already in the session, otherwise attach the cached one
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+async def cache_user(user: User) -> None:
+    """Store a user under both its email and username keys"""
+    redis = get_redis()
+    if redis is None:
+        return
+    
+    payload = _dump(user)
+    ttl = settings.USER_CACHE_TTL_SECONDS
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.setex(_key("email", user.email), ttl, payload)
+            pipe.setex(_key("username", user.username), ttl, payload)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"User cache write failed: {str(e)}")
+
+
+async def invalidate_user(email: str, username: str) -> None:
+    """Drop a user's cache entries after their row changed"""
+    redis = get_redis()
+    if redis is None:
+        return
+    
+    try:
+        await redis.delete(_key("email", email), _key("username", username))
+    except Exception as e:
+        logger.warning(f"User cache invalidation failed: {str(e)}")
@@ -1,5 +1,8 @@
 from httpx import AsyncClient
 from unittest.mock import patch, MagicMock
+from sqlalchemy import event
+
+from app.services.message_service import MessageService, _STREAM_BATCH
 
 
 # HELPER METHODS
@@ -113,6 +116,35 @@ async def test_send_message_conversation_flow(mock_runner_run, client: AsyncClie
     assert response2.status_code == 200
     assert len(response2.json()["history"]) == 4  # 2 user + 2 assistant
 
+@patch('app.routers.messages.Runner.run')
+async def test_send_message_statement_count(mock_runner_run, client: AsyncClient, db_session):
+    """✅ Test sending a message loads thread and session in one query (no N+1)"""
+    token, _, thread_id = await setup_user_session_thread(client)
+    
+    mock_result = MagicMock()
+    mock_result.final_output = "This is the AI response"
+    mock_runner_run.return_value = mock_result
+    
+    statements = []
+    
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        response = await client.post(
+            f"/messages/{thread_id}",
+            json={"content": "Hello, AI!"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    
+    assert response.status_code == 200
+    # Current user, thread + session (one JOIN), history, one INSERT for both messages
+    assert len(statements) == 4
+
 async def test_send_message_without_auth(client: AsyncClient):
     """❌ Test sending message without authentication"""
     payload = {"content": "Hello"}
@@ -224,4 +256,94 @@ async def test_send_message_missing_content(client: AsyncClient):
         headers={"Authorization": f"Bearer {token}"}
     )
     
-    assert response.status_code == 422
\ No newline at end of file
+    assert response.status_code == 422
+
+# ========================================================================
+# GET THREAD HISTORY TESTS
+# ========================================================================
+
+@patch('app.routers.messages.Runner.run')
+async def test_get_thread_history_success(mock_runner_run, client: AsyncClient):
+    """✅ Test getting the messages of an owned thread"""
+    token, _, thread_id = await setup_user_session_thread(client)
+    
+    # Empty thread returns an empty list
+    response = await client.get(
+        f"/messages/{thread_id}",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+    
+    mock_result = MagicMock()
+    mock_result.final_output = "This is the AI response"
+    mock_runner_run.return_value = mock_result
+    
+    await client.post(
+        f"/messages/{thread_id}",
+        json={"content": "Hello, AI!"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    response = await client.get(
+        f"/messages/{thread_id}",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [m["role"] for m in data] == ["user", "assistant"]
+    assert data[0]["content"] == "Hello, AI!"
+    # Same UTC timestamp format as the response_model / pydantic JSON path
+    assert data[0]["created_at"].endswith("Z")
+
+
+async def test_get_thread_history_nonexistent_thread(client: AsyncClient):
+    """❌ Test getting messages of a thread that doesn't exist"""
+    token, _, _ = await setup_user_session_thread(client)
+    
+    response = await client.get(
+        "/messages/99999",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    assert response.status_code == 404
+
+
+async def test_get_thread_history_other_users_thread(client: AsyncClient):
+    """❌ Test getting messages of another user's thread"""
+    _, _, thread_id = await setup_user_session_thread(client)
+    
+    await client.post(
+        "/auth/register",
+        json={"username": "user2", "email": "user2@example.com", "password": "password123"}
+    )
+    login2 = await client.post(
+        "/auth/login",
+        params={"username": "user2", "password": "password123"}
+    )
+    token2 = login2.json()["access_token"]
+    
+    response = await client.get(
+        f"/messages/{thread_id}",
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    
+    assert response.status_code == 403
+    assert "not allowed" in response.json()["detail"].lower()
+
+
+async def test_iter_messages_for_thread_spans_batches(client: AsyncClient, db_session):
+    """✅ Test streaming a thread longer than one batch yields every message in order"""
+    _, _, thread_id = await setup_user_session_thread(client)
+    
+    msg_svc = MessageService(db_session)
+    count = 2 * _STREAM_BATCH + 1
+    created = await msg_svc.bulk_create_messages([
+        {"thread_id": thread_id, "role": "user", "content": f"message {i}"}
+        for i in range(count)
+    ])
+    
+    streamed = [m async for m in msg_svc.iter_messages_for_thread(thread_id)]
+    
+    assert [m.id for m in streamed] == [m.id for m in created]
+    assert [m.content for m in streamed] == [f"message {i}" for i in range(count)]
@@ -170,4 +170,91 @@ async def test_create_multiple_threads(client: AsyncClient):
             thread_ids.append(response.json()["id"])
         
         # All threads should have unique IDs
-        assert len(set(thread_ids)) == 3
\ No newline at end of file
+        assert len(set(thread_ids)) == 3
+
+async def test_update_thread_title(client: AsyncClient):
+        """✅ Test updating a thread's title"""
+        token, session_id = await setup_user_and_session(client)
+        
+        create_response = await client.post(
+            f"/threads/{session_id}",
+            json={"title": "Old Title"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        thread_id = create_response.json()["id"]
+        
+        response = await client.patch(
+            f"/threads/thread/{thread_id}",
+            json={"title": "New Title"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == thread_id
+        assert data["title"] == "New Title"
+
+async def test_update_nonexistent_thread(client: AsyncClient):
+        """❌ Test updating a thread that doesn't exist"""
+        token, _ = await setup_user_and_session(client)
+        
+        response = await client.patch(
+            "/threads/thread/99999",
+            json={"title": "New Title"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 404
+
+async def test_delete_thread(client: AsyncClient):
+        """✅ Test deleting a thread"""
+        token, session_id = await setup_user_and_session(client)
+        
+        create_response = await client.post(
+            f"/threads/{session_id}",
+            json={"title": "To Delete"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        thread_id = create_response.json()["id"]
+        
+        response = await client.delete(
+            f"/threads/thread/{thread_id}",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 204
+        
+        # Deleting again finds nothing
+        response = await client.delete(
+            f"/threads/thread/{thread_id}",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 404
+
+async def test_create_threads_batch(client: AsyncClient):
+        """✅ Test creating several threads in one request"""
+        token, session_id = await setup_user_and_session(client)
+        
+        payload = [{"title": "Batch 1"}, {"title": None}, {"title": "Batch 3"}]
+        response = await client.post(
+            f"/threads/{session_id}/batch",
+            json=payload,
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 201
+        data = response.json()
+        assert [t["title"] for t in data] == ["Batch 1", None, "Batch 3"]
+        assert all(t["session_id"] == session_id for t in data)
+        assert len({t["id"] for t in data}) == 3
+
+async def test_create_threads_batch_invalid_session(client: AsyncClient):
+        """❌ Test batch creation in a session that doesn't exist"""
+        token, _ = await setup_user_and_session(client)
+        
+        response = await client.post(
+            "/threads/99999/batch",
+            json=[{"title": "Orphan"}],
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 404